@@ -0,0 +1,104 @@
+"""Micro-benchmark of ImagesModel with large image lists.
+
+Compares the indexed model against the previous list-backed implementation
+(linear duplicate check and removal, a copy on every get_images). Paths are
+synthetic, nothing is read from disk.
+
+    python -m benchmarks.bench_images_model --count 100000
+"""
+import argparse
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from src.ui.model.images_model import ImagesModel
+
+
+class ListImagesModel(QObject):
+    """The list-backed ImagesModel this benchmark compares against"""
+    imagesChanged = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._images = []
+
+    def get_images(self):
+        return list(self._images)
+
+    def add_images(self, paths):
+        for path in paths:
+            if path not in self._images:
+                self._images.append(path)
+        self.imagesChanged.emit()
+
+    def remove_image(self, path):
+        if path in self._images:
+            self._images.remove(path)
+            self.imagesChanged.emit()
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(model_cls, paths, chunk: int, removals: int):
+    model = model_cls()
+    notifications = []
+    model.imagesChanged.connect(lambda: notifications.append(1))
+    results = {}
+
+    # Folder drop: one call with every path, then the same paths again (all duplicates)
+    results["add (one call)"] = timed(lambda: model.add_images(paths))
+    results["add duplicates"] = timed(lambda: model.add_images(paths))
+
+    # Many small adds, batched where the model supports it
+    model = model_cls()
+    model.imagesChanged.connect(lambda: notifications.append(1))
+    notifications.clear()
+
+    def add_chunks():
+        if hasattr(model, "batch"):
+            with model.batch():
+                for i in range(0, len(paths), chunk):
+                    model.add_images(paths[i:i + chunk])
+        else:
+            for i in range(0, len(paths), chunk):
+                model.add_images(paths[i:i + chunk])
+    results[f"add in chunks of {chunk}"] = timed(add_chunks)
+    results["notifications"] = len(notifications)
+
+    results["get_images x100"] = timed(lambda: [model.get_images() for _ in range(100)])
+
+    step = max(1, len(paths) // removals)
+    targets = paths[::step][:removals]
+    results[f"remove x{len(targets)}"] = timed(lambda: [model.remove_image(p) for p in targets])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="Number of image paths")
+    parser.add_argument("--chunk", type=int, default=100, help="Paths per add_images call for the chunked add")
+    parser.add_argument("--removals", type=int, default=1000, help="Number of remove_image calls")
+    parser.add_argument("--skip-list", action="store_true",
+                        help="Skip the list-backed model, its adds are quadratic and take minutes at 100k")
+    args = parser.parse_args()
+
+    paths = [f"/photos/folder_{i // 1000:03d}/IMG_{i:06d}.jpg" for i in range(args.count)]
+    models = [("indexed", ImagesModel)]
+    if not args.skip_list:
+        models.append(("list", ListImagesModel))
+
+    rows = {name: bench(cls, paths, args.chunk, args.removals) for name, cls in models}
+    print(f"{args.count} paths")
+    print(f"{'':<24}" + "".join(f"{name:>14}" for name, _ in models))
+    for metric in rows["indexed"]:
+        cells = (f"{rows[name][metric]:>14}" if metric == "notifications" else f"{rows[name][metric]:>11.1f} ms"
+                 for name, _ in models)
+        print(f"{metric:<24}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Model load benchmark: from_pretrained against the memory-mapped fast-load artifact.
+
+Every measurement runs in a fresh interpreter so nothing is reused between
+runs; library imports are timed separately from the load itself. "cold"
+evicts the weight files from the page cache first (posix_fadvise, Linux,
+no root needed), "warm" loads them again straight after. The model must be
+downloaded, and the artifact is created by the first fast load.
+
+    python -m benchmarks.bench_model_load --model rmbg14 --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+start = time.perf_counter()
+import torch
+from src.utils.backends import load_torch_model
+imported = time.perf_counter()
+model = load_torch_model({model!r}, torch.device("cpu"), fast={fast})
+loaded = time.perf_counter()
+
+memory = {{}}
+try:
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            if key in ("Rss", "Private_Clean", "Private_Dirty", "Shared_Clean"):
+                memory[key] = int(value.split()[0]) / 1024
+except OSError:
+    pass
+print(json.dumps({{"imports": imported - start, "load": loaded - imported, "memory": memory}}), flush=True)
+"""
+
+
+def evict(paths):
+    """Drop files from the page cache so the next read comes from disk"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in paths:
+        if os.path.isfile(path):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+    return True
+
+
+def run_once(model: str, fast: bool) -> dict:
+    code = CHILD.format(model=model, fast=fast)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(next(l for l in reversed(out.stdout.splitlines()) if l.startswith("{")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="rmbg14")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    model_dir = os.path.join(ROOT, "models", args.model)
+    weights = [os.path.join(model_dir, name) for name in ("model.safetensors", "model_fast.pt")]
+    if not os.path.isfile(weights[0]):
+        sys.exit(f"Model {args.model} is not downloaded")
+
+    run_once(args.model, fast=True)  # make sure the artifact exists
+
+    rows = {}
+    for name, fast in (("from_pretrained", False), ("fast load", True)):
+        for cache in ("cold", "warm"):
+            results = []
+            for _ in range(args.runs):
+                if cache == "cold" and not evict(weights):
+                    break
+                results.append(run_once(args.model, fast))
+            if results:
+                rows[f"{name} ({cache})"] = results
+
+    print(f"{'':<26}{'imports':>10}{'load':>10}{'RSS':>10}{'private':>10}")
+    for label, results in rows.items():
+        imports = statistics.median(r["imports"] for r in results) * 1000
+        load = statistics.median(r["load"] for r in results) * 1000
+        memory = results[-1]["memory"]
+        rss = f"{memory['Rss']:.0f}" if "Rss" in memory else "-"
+        private = (f"{memory['Private_Clean'] + memory['Private_Dirty']:.0f}"
+                   if "Private_Dirty" in memory else "-")
+        print(f"{label:<26}{imports:>8.0f}ms{load:>8.0f}ms{rss:>8}MB{private:>8}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Startup benchmark: time from process start to the main window being painted.
+
+Each run starts a fresh interpreter that builds MainWindow like main.py
+does and reports when the window receives its first paint event, plus
+which heavy ML modules were imported by then. --eager imports torch and
+transformers first, which is how startup behaved before they were made lazy.
+
+    python -m benchmarks.bench_startup --runs 5 [--eager] [--offscreen]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("torch", "transformers", "torchvision", "huggingface_hub", "onnxruntime")
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+if {eager}:
+    import torch, transformers
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from src.ui.main_window import MainWindow
+imported = time.perf_counter()
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            heavy = [m for m in {heavy!r} if m in sys.modules]
+            print(json.dumps({{"imports": imported - start, "shown": time.perf_counter() - start, "heavy": heavy}}),
+                  flush=True)
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app = QApplication(sys.argv)
+window = MainWindow()
+first_paint = FirstPaint()
+window.installEventFilter(first_paint)
+window.show()
+app.exec_()
+"""
+
+
+def run_once(eager: bool, env: dict) -> dict:
+    code = CHILD.format(eager=eager, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    total = time.perf_counter() - started
+    line = next(l for l in reversed(out.stdout.splitlines()) if l.startswith("{"))
+    result = json.loads(line)
+    result["total"] = total  # includes interpreter start up
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="Import torch and transformers before the window")
+    parser.add_argument("--offscreen", action="store_true", help="Use Qt's offscreen platform (no display needed)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    results = [run_once(args.eager, env) for _ in range(args.runs)]
+    for key, label in (("imports", "imports"), ("shown", "window painted"), ("total", "incl. interpreter")):
+        values = [r[key] * 1000 for r in results]
+        print(f"{label:<20} median {statistics.median(values):7.0f} ms   min {min(values):7.0f} ms")
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    print(f"ML modules loaded before first paint: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Offline benchmark of preprocessing, inference and postprocessing with stand-in models.
+
+No model download is needed: a stand-in network with the same input and
+output contract (see benchmarks/standin_models.py) is plugged into
+RemoveBgManager, and synthetic JPEGs of 1, 12 and 50 MP are generated.
+Every size runs in a fresh interpreter so its peak RSS is its own. For
+each size this measures:
+
+- latency: one image at a time through RemoveBgManager.remove_background
+  (decode, preprocess, forward, postprocess, composite), p50/p95
+- throughput: a run of the batch pipeline including encoding and saving,
+  in images/s, with the p50 of each stage
+- peak RSS of the process
+
+Results are compared against a stored baseline, and the exit code is 1
+when a metric regressed by more than --tolerance. Baselines only compare
+on the machine (and stand-in, tier, format) they were recorded with.
+
+    python -m benchmarks.run_benchmarks --save-baseline
+    python -m benchmarks.run_benchmarks --standin torch --sizes 1 12
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.standin_models import STANDINS
+from src.models_data import AVAILABLE_MODELS, RESOLUTION_TIERS, DEFAULT_RESOLUTION_TIER
+from src.utils.execution_profile import EXECUTION_PROFILES, DEFAULT_PROFILE
+from src.utils.output_encoder import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT
+from src.utils.remove_bg_manager import DEFAULT_BATCH_SIZE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = (1, 12, 50)  # megapixels
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.15  # relative change that counts as a regression
+
+# metric -> whether higher is better
+METRICS = {
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "images_per_sec": True,
+    "peak_rss_mb": False
+}
+
+
+def make_image(path: str, megapixels: float):
+    """4:3 JPEG of about megapixels, smooth gradients plus noise so it compresses and decodes like a photo"""
+    from PIL import Image
+
+    width = round((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = round(megapixels * 1e6 / width)
+    size = (width, height)
+    red = Image.linear_gradient("L").resize(size)
+    green = Image.radial_gradient("L").resize(size)
+    blue = Image.blend(red.rotate(90, expand=False), Image.effect_noise(size, 48), 0.3)
+    Image.merge("RGB", (red, green, blue)).save(path, "JPEG", quality=90)
+
+
+def run_child(args, image_path: str, out_dir: str) -> dict:
+    """Benchmark one image size in this process, called in a fresh interpreter"""
+    from src.utils.pipeline import RemoveBgPipeline
+    from src.utils.remove_bg_manager import RemoveBgManager
+    from src.utils.output_encoder import save_image
+    from src.utils.run_stats import RunStats, current_rss_mb, max_rss_mb, percentile
+    from benchmarks.standin_models import install_standin
+
+    manager = RemoveBgManager()
+    manager.set_execution_profile(args.profile)
+    manager.set_resolution_tier(args.tier)
+    install_standin(manager, args.standin, args.model)
+    manager.warm_up()
+    setup_rss = current_rss_mb()
+
+    latencies = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        manager.remove_background(image_path)
+        latencies.append(time.perf_counter() - start)
+
+    def save_result(path, image, timings):
+        return save_image(image, os.path.join(out_dir, "result"), args.format, timings)
+
+    stats = RunStats()
+    pipeline = RemoveBgPipeline(manager, save_result, batch_size=args.batch_size, stats=stats)
+    results = list(pipeline.run([image_path] * args.images))
+    summary = stats.summary()
+    if any(result is None for *_, result in results):
+        raise RuntimeError("Some images failed, see the log")
+
+    return {
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p95_ms": percentile(latencies, 95) * 1000,
+        "images_per_sec": summary["images_per_sec"],
+        "peak_rss_mb": max_rss_mb(),
+        "setup_rss_mb": setup_rss,
+        "stages_p50_ms": {stage: s["p50_ms"] for stage, s in summary["stages"].items()}
+    }
+
+
+def run_size(args, megapixels: float, work_dir: str) -> dict:
+    image_path = os.path.join(work_dir, f"{megapixels:g}mp.jpg")
+    if not os.path.exists(image_path):
+        make_image(image_path, megapixels)
+    command = [sys.executable, "-m", "benchmarks.run_benchmarks", "--child", image_path, "--out-dir", work_dir,
+               "--standin", args.standin, "--model", args.model, "--tier", args.tier, "--profile", args.profile,
+               "--format", args.format, "--batch-size", str(args.batch_size), "--runs", str(args.runs),
+               "--images", str(args.images)]
+    out = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if out.returncode:
+        sys.exit(f"{megapixels:g} MP benchmark failed:\n{out.stderr}")
+    return json.loads(next(l for l in reversed(out.stdout.splitlines()) if l.startswith("{")))
+
+
+def settings(args) -> dict:
+    """What a baseline has to match to be comparable"""
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "standin": args.standin,
+        "model": args.model,
+        "tier": args.tier,
+        "profile": args.profile,
+        "format": args.format,
+        "batch_size": args.batch_size
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each metric against the baseline, return the regressions"""
+    regressions = []
+    print(f"\n{'':<8}{'metric':<18}{'baseline':>12}{'now':>12}{'change':>10}")
+    for size, metrics in results.items():
+        for metric, higher_is_better in METRICS.items():
+            old = baseline.get(size, {}).get(metric)
+            if not old:
+                continue
+            new = metrics[metric]
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > tolerance else ""
+            if flag:
+                regressions.append(f"{size} {metric}")
+            print(f"{size:<8}{metric:<18}{old:>12.1f}{new:>12.1f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES, help="Image sizes in megapixels")
+    parser.add_argument("--standin", choices=STANDINS, default="numpy")
+    parser.add_argument("--model", choices=AVAILABLE_MODELS, default="rmbg14",
+                        help="Model whose preprocessing and output the stand-in imitates")
+    parser.add_argument("--tier", choices=list(RESOLUTION_TIERS), default=DEFAULT_RESOLUTION_TIER)
+    parser.add_argument("--profile", choices=list(EXECUTION_PROFILES), default=DEFAULT_PROFILE, help="CPU execution profile")
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default=DEFAULT_OUTPUT_FORMAT,
+                        help="Output format of the throughput run")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--runs", type=int, default=5, help="Latency measurements per size")
+    parser.add_argument("--images", type=int, default=8, help="Images in the throughput run per size")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--child", metavar="IMAGE", help=argparse.SUPPRESS)
+    parser.add_argument("--out-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args, args.child, args.out_dir)), flush=True)
+        return
+
+    results = {}
+    print(f"{'size':<8}{'p50':>10}{'p95':>10}{'img/s':>8}{'peak RSS':>10}  stage p50 (ms)")
+    with tempfile.TemporaryDirectory(prefix="free-remove-bg-bench-") as work_dir:
+        for megapixels in args.sizes:
+            size = f"{megapixels:g}MP"
+            result = results[size] = run_size(args, megapixels, work_dir)
+            stages = ", ".join(f"{stage} {ms:.0f}" for stage, ms in result["stages_p50_ms"].items())
+            print(f"{size:<8}{result['latency_p50_ms']:>8.0f}ms{result['latency_p95_ms']:>8.0f}ms"
+                  f"{result['images_per_sec']:>8.2f}{result['peak_rss_mb']:>8.0f}MB  {stages}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"settings": settings(args), "results": results}, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, store one with --save-baseline")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    different = {key: (value, settings(args).get(key)) for key, value in baseline["settings"].items()
+                 if settings(args).get(key) != value}
+    if different:
+        print("\nBaseline was recorded with different settings, differences are not only from the code: "
+              + ", ".join(f"{key} {old} -> {new}" for key, (old, new) in different.items()))
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
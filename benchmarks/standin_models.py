@@ -0,0 +1,73 @@
+"""Stand-in models for benchmarking RemoveBgManager without downloading the real ones.
+
+Both follow the backend contract of src.utils.backends (prepare, run,
+size_bytes): run takes normalized float32 images [B, 3, H, W] and returns
+mask predictions [B, 1, H, W]. Their weights are random, so the masks are
+meaningless, only the cost of the code around the model is realistic.
+
+- "numpy": a random 1x1 convolution and a sigmoid, no torch needed.
+- "torch": a small randomly initialized conv net, run through the real
+  TorchBackend (mask output wrapper, memory format, inference context).
+"""
+import numpy as np
+
+STANDINS = ("numpy", "torch")
+
+
+class NumpyStandIn:
+    name = "numpy"
+
+    def __init__(self, seed: int = 0):
+        self.weights = np.random.default_rng(seed).standard_normal(3).astype(np.float32)
+
+    def size_bytes(self) -> int:
+        return self.weights.nbytes
+
+    def prepare(self, profile: dict):
+        pass
+
+    def run(self, images: np.ndarray, profile: dict) -> np.ndarray:
+        logits = np.tensordot(self.weights, images, axes=([0], [1]))  # [B, H, W]
+        return (1 / (1 + np.exp(-logits)))[:, None].astype(np.float32)
+
+
+def torch_standin(model_name: str, seed: int = 0):
+    """TorchBackend around a tiny conv net that returns what model_name's real network returns"""
+    import torch
+    from src.utils.backends import TorchBackend
+
+    class TinySegNet(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.encoder = torch.nn.Sequential(
+                torch.nn.Conv2d(3, 16, 3, stride=2, padding=1), torch.nn.ReLU(),
+                torch.nn.Conv2d(16, 32, 3, stride=2, padding=1), torch.nn.ReLU()
+            )
+            self.head = torch.nn.Conv2d(32, 1, 1)
+
+        def forward(self, images):
+            logits = torch.nn.functional.interpolate(self.head(self.encoder(images)), size=images.shape[-2:],
+                                                     mode="bilinear", align_corners=False)
+            if model_name == "rmbg14":
+                return [logits.sigmoid()], []  # side outputs first, full-resolution output first among them
+            return [logits]  # refinement outputs, the last one as logits
+
+    torch.manual_seed(seed)
+    return TorchBackend(model_name, TinySegNet().eval(), torch.device("cpu"))
+
+
+def build_standin(kind: str, model_name: str):
+    if kind == "numpy":
+        return NumpyStandIn()
+    if kind == "torch":
+        return torch_standin(model_name)
+    raise ValueError(f"Stand-in {kind} is not available. Choose from {STANDINS}")
+
+
+def install_standin(manager, kind: str, model_name: str):
+    """Make a stand-in the current model of manager, as if model_name had been loaded with its settings"""
+    if kind == "torch":
+        from src.utils.execution_profile import apply_thread_settings
+        apply_thread_settings(manager.profile)  # done by a real load
+    manager.model_cache.put(manager._cache_key(model_name), build_standin(kind, model_name))
+    manager.load_model(model_name)
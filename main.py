@@ -1,12 +1,36 @@
 import sys
-from PyQt5.QtWidgets import QApplication
-from src.ui.main_window import MainWindow  # import the window
+
+# Import torch/transformers in a background thread once the window is up,
+# so the first "Remove BG" does not have to wait for them
+PRELOAD_ML_MODULES = True
+
+def preload_ml_modules():
+    import logging
+    try:
+        import src.utils.backends  # noqa: F401 (torch, transformers)
+    except Exception as e:
+        logging.warning(f"Could not preload the inference modules: {e}")
 
 def main():
+    # Headless mode, keep PyQt5 out of the import graph
+    if len(sys.argv) > 1 and sys.argv[1] in ("batch", "compare", "tiers"):
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    # Only PyQt5 and PIL are needed to show the window, the ML stack is imported lazily
+    import threading
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    from src.ui.main_window import MainWindow  # import the window
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    if PRELOAD_ML_MODULES:
+        QTimer.singleShot(0, lambda: threading.Thread(target=preload_ml_modules, daemon=True).start())
+    # The selected model is loaded after the first paint too
+    QTimer.singleShot(0, window.remove_bg_controller.start_preloading)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,284 @@
+"""Headless entry points: `python main.py batch --model rmbg14 --in DIR --out DIR`
+and `python main.py compare --model rmbg20 --in DIR --against int8|onnx`.
+
+Must not import PyQt5 (directly or through src.ui) so it can run on
+machines without a display.
+"""
+import argparse
+import itertools
+import logging
+import os
+import time
+from contextlib import nullcontext
+import numpy as np
+
+from src.models_data import AVAILABLE_MODELS, BACKENDS, PRECISIONS, RESOLUTION_TIERS, DEFAULT_RESOLUTION_TIER
+from src.utils.download_manager import download_model, is_model_downloaded
+from src.utils.remove_bg_manager import RemoveBgManager, DEFAULT_BATCH_SIZE
+from src.utils.result_cache import ResultCache
+from src.utils.output_encoder import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, output_extension, save_image
+from src.utils.pipeline import RemoveBgPipeline
+from src.utils.run_stats import RunStats
+from src.utils.profiler import ProfileCapture
+from src.utils.execution_profile import EXECUTION_PROFILES, DEFAULT_PROFILE
+
+VALID_EXTS = ('.png', '.jpg', '.jpeg')
+
+# Variants that `compare` can check against the PyTorch float model: name -> (backend, precision)
+COMPARE_VARIANTS = {
+    "float": ("torch", "float"),
+    "int8": ("torch", "int8"),
+    "onnx": ("onnx", "float"),
+    "onnx-int8": ("onnx", "int8")
+}
+
+
+def iter_images(in_dir: str, recursive: bool = False):
+    """Yield image paths one by one.
+
+    Uses os.scandir iterators instead of os.listdir/os.walk so a folder with
+    100k files is never materialized as a list.
+    """
+    stack = [in_dir]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.is_file() and entry.name.lower().endswith(VALID_EXTS):
+                    yield entry.path
+
+
+def output_path(image_path: str, in_dir: str, out_dir: str, extension: str = ".png") -> str:
+    rel_dir = os.path.relpath(os.path.dirname(image_path), in_dir)
+    name = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.normpath(os.path.join(out_dir, rel_dir, f"{name}_no_bg{extension}"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.py", description="Free Remove BG")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Remove backgrounds from a folder without the GUI")
+    batch.add_argument("--model", choices=AVAILABLE_MODELS, default="rmbg14")
+    batch.add_argument("--in", dest="in_dir", required=True, help="Input folder")
+    batch.add_argument("--out", dest="out_dir", required=True, help="Output folder")
+    batch.add_argument("--profile", choices=list(EXECUTION_PROFILES), default=DEFAULT_PROFILE, help="CPU execution profile")
+    batch.add_argument("--tier", choices=list(RESOLUTION_TIERS), default=DEFAULT_RESOLUTION_TIER,
+                       help="Model input resolution (speed/quality trade-off)")
+    batch.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Images per forward pass")
+    batch.add_argument("--recursive", action="store_true", help="Also process subfolders")
+    batch.add_argument("--skip-existing", action="store_true", help="Skip images whose output already exists")
+    batch.add_argument("--precision", choices=PRECISIONS, default="float", help="Model weights precision")
+    batch.add_argument("--backend", choices=list(BACKENDS), default="torch", help="Inference backend")
+    batch.add_argument("--format", choices=list(OUTPUT_FORMATS), default=DEFAULT_OUTPUT_FORMAT,
+                       help="Output file format (png_fast/png_raw trade file size for encode speed)")
+    batch.add_argument("--report", metavar="DIR", help="Write a JSON/CSV report with per-image stage timings to DIR")
+    batch.add_argument("--trace", action="store_true",
+                       help="Profile the run (torch operators and Python stacks), saved to a profile-* folder in --out")
+    batch.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    batch.add_argument("--download", action="store_true", help="Download the model if it is missing")
+
+    compare = commands.add_parser("compare", help="Compare masks and speed of a model variant against float weights")
+    compare.add_argument("--model", choices=AVAILABLE_MODELS, default="rmbg14")
+    compare.add_argument("--in", dest="in_dir", required=True, help="Folder with sample images")
+    compare.add_argument("--against", choices=[v for v in COMPARE_VARIANTS if v != "float"], default="int8")
+    compare.add_argument("--tolerance", type=float, default=None,
+                         help="Fail (exit code 1) if the mean abs alpha error is above this many levels")
+    compare.add_argument("--limit", type=int, default=20, help="Number of images to compare")
+    compare.add_argument("--profile", choices=list(EXECUTION_PROFILES), default=DEFAULT_PROFILE, help="CPU execution profile")
+    compare.add_argument("--tier", choices=list(RESOLUTION_TIERS), default=DEFAULT_RESOLUTION_TIER,
+                         help="Model input resolution used by both variants")
+
+    tiers = commands.add_parser("tiers", help="Benchmark latency against mask error for every resolution tier")
+    tiers.add_argument("--model", choices=AVAILABLE_MODELS, default="rmbg14")
+    tiers.add_argument("--in", dest="in_dir", required=True, help="Folder with sample images")
+    tiers.add_argument("--limit", type=int, default=10, help="Number of images to use")
+    tiers.add_argument("--profile", choices=list(EXECUTION_PROFILES), default=DEFAULT_PROFILE, help="CPU execution profile")
+    return parser
+
+
+def run_batch(args) -> int:
+    if not os.path.isdir(args.in_dir):
+        logging.error(f"Input folder {args.in_dir} does not exist")
+        return 2
+
+    if not is_model_downloaded(args.model):
+        if not args.download:
+            logging.error(f"Model {args.model} is not downloaded. Re-run with --download to fetch it.")
+            return 2
+        logging.info(f"Downloading model {args.model}.")
+        download_model(args.model)
+
+    logging.info(f"Loading model {args.model}.")
+    manager = RemoveBgManager()
+    manager.set_execution_profile(args.profile)
+    manager.set_precision(args.precision)
+    manager.set_backend(args.backend)
+    manager.set_resolution_tier(args.tier)
+    manager.load_model(args.model)
+
+    processed = failed = skipped = 0
+    extension = output_extension(args.format)
+
+    def pending_images():
+        nonlocal skipped
+        for image_path in iter_images(args.in_dir, args.recursive):
+            if args.skip_existing and os.path.exists(output_path(image_path, args.in_dir, args.out_dir, extension)):
+                skipped += 1
+                continue
+            yield image_path
+
+    def save_result(image_path, image, timings):
+        # Runs in the pipeline's encode pool
+        dest_path = output_path(image_path, args.in_dir, args.out_dir, extension)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        return save_image(image, os.path.splitext(dest_path)[0], args.format, timings)
+
+    # A traced run skips the result cache, cached images would never reach the model
+    profiler = ProfileCapture(args.out_dir, manager) if args.trace else None
+    result_cache = None if args.no_cache or args.trace else ResultCache()
+    stats = RunStats()
+    pipeline = RemoveBgPipeline(manager, save_result, batch_size=args.batch_size, result_cache=result_cache,
+                                stats=stats, profiler=profiler)
+    started = last = time.perf_counter()
+    with profiler if profiler is not None else nullcontext():
+        for _, image_path, dest_path in pipeline.run(pending_images()):
+            now = time.perf_counter()
+            dt, last = now - last, now
+            if dest_path is None:
+                failed += 1
+                continue
+
+            # Time between consecutive results, i.e. the amortized per-image cost of the pipeline
+            processed += 1
+            logging.info(f"[{processed}] {image_path} -> {dest_path} "
+                         f"{dt * 1000:.0f} ms ({1 / max(dt, 1e-9):.2f} img/s, avg {processed / (now - started):.2f} img/s)")
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Done: {processed} processed, {skipped} skipped, {failed} failed in {elapsed:.1f} s ({rate:.2f} img/s)")
+    for variant, latency in manager.latency_report().items():
+        logging.info(f"Inference latency ({variant}): {latency:.0f} ms/image")
+    if result_cache is not None:
+        hits, misses = pipeline.cache_stats()
+        logging.info(f"Result cache: {hits} hits, {misses} misses")
+    stats.log_summary(force=True)
+    if args.report:
+        meta = {**pipeline.settings, "precision": args.precision, "backend": args.backend,
+                "batch_size": args.batch_size, "output_format": args.format}
+        logging.info(f"Run report saved to {stats.write_report(args.report, meta)}")
+    return 1 if failed else 0
+
+
+def run_compare(args) -> int:
+    """Mean absolute alpha error (0-255 levels, at model resolution) and speed of a variant vs PyTorch float.
+
+    With --tolerance this doubles as the parity check for the int8 and ONNX variants.
+    """
+    if not is_model_downloaded(args.model):
+        logging.error(f"Model {args.model} is not downloaded.")
+        return 2
+
+    image_paths = list(itertools.islice(iter_images(args.in_dir), args.limit))
+    if not image_paths:
+        logging.error(f"No images found in {args.in_dir}")
+        return 2
+
+    manager = RemoveBgManager()
+    manager.set_execution_profile(args.profile)
+    manager.set_resolution_tier(args.tier)
+    masks, seconds = {}, {}
+    for variant in ("float", args.against):
+        backend, precision = COMPARE_VARIANTS[variant]
+        manager.set_backend(backend)
+        manager.set_precision(precision)
+        manager.load_model(args.model)
+        masks[variant], seconds[variant] = [], 0.0
+        for image_path in image_paths:
+            _, model_input = manager.load_input(image_path)
+            t0 = time.perf_counter()
+            pred = manager.predict([model_input])[0]
+            seconds[variant] += time.perf_counter() - t0
+            masks[variant].append(np.asarray(manager.mask(pred), dtype=np.int16))
+    manager.set_backend("torch")
+    manager.set_precision("float")
+
+    errors = []
+    for image_path, reference, mask in zip(image_paths, masks["float"], masks[args.against]):
+        errors.append(np.abs(reference - mask).mean())
+        logging.info(f"{image_path}: mean abs alpha error {errors[-1]:.2f}")
+
+    n = len(image_paths)
+    logging.info(f"{args.model} {args.against} vs float over {n} images: "
+                 f"mean abs alpha error {np.mean(errors):.2f} (max {np.max(errors):.2f}), "
+                 f"{1000 * seconds['float'] / n:.0f} ms -> {1000 * seconds[args.against] / n:.0f} ms per image "
+                 f"({seconds['float'] / max(seconds[args.against], 1e-9):.2f}x)")
+    if args.tolerance is not None and np.mean(errors) > args.tolerance:
+        logging.error(f"Mean abs alpha error {np.mean(errors):.2f} is above the tolerance of {args.tolerance}")
+        return 1
+    return 0
+
+
+def run_tiers(args) -> int:
+    """Table of forward latency and full-resolution mask error per tier, relative to the native 1024 tier.
+
+    Lower tiers are reported with plain bilinear and with guided-filter upsampling.
+    """
+    if not is_model_downloaded(args.model):
+        logging.error(f"Model {args.model} is not downloaded.")
+        return 2
+
+    image_paths = list(itertools.islice(iter_images(args.in_dir), args.limit))
+    if not image_paths:
+        logging.error(f"No images found in {args.in_dir}")
+        return 2
+
+    manager = RemoveBgManager()
+    manager.set_execution_profile(args.profile)
+    manager.load_model(args.model)
+    reference_tier = max(RESOLUTION_TIERS, key=RESOLUTION_TIERS.get)
+    tiers = sorted(RESOLUTION_TIERS, key=RESOLUTION_TIERS.get, reverse=True)  # reference first
+
+    references = {}
+    rows = []
+    for tier in tiers:
+        manager.set_resolution_tier(tier)
+        seconds, bilinear_errors, guided_errors = 0.0, [], []
+        for image_path in image_paths:
+            source, model_input = manager.load_input(image_path)
+            t0 = time.perf_counter()
+            pred = manager.predict([model_input])[0]
+            seconds += time.perf_counter() - t0
+
+            full = source.full()
+            guided = np.asarray(manager.mask(pred, source.size, guide=full), dtype=np.int16)
+            if tier == reference_tier:
+                references[image_path] = guided
+                continue
+            bilinear = np.asarray(manager.mask(pred, source.size), dtype=np.int16)
+            bilinear_errors.append(np.abs(bilinear - references[image_path]).mean())
+            guided_errors.append(np.abs(guided - references[image_path]).mean())
+        rows.append((tier, RESOLUTION_TIERS[tier], 1000 * seconds / len(image_paths),
+                     np.mean(bilinear_errors) if bilinear_errors else 0.0,
+                     np.mean(guided_errors) if guided_errors else 0.0))
+    manager.set_resolution_tier(DEFAULT_RESOLUTION_TIER)
+
+    logging.info(f"{args.model} over {len(image_paths)} images, mean abs alpha error vs {reference_tier}:")
+    logging.info(f"{'tier':<10} {'input':>6} {'ms/img':>8} {'bilinear':>9} {'guided':>7}")
+    for tier, size, latency, bilinear_error, guided_error in rows:
+        logging.info(f"{tier:<10} {size:>6} {latency:>8.0f} {bilinear_error:>9.2f} {guided_error:>7.2f}")
+    return 0
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+    args = build_parser().parse_args(argv)
+    if args.command == "batch":
+        return run_batch(args)
+    if args.command == "compare":
+        return run_compare(args)
+    if args.command == "tiers":
+        return run_tiers(args)
+    return 2
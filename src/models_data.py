@@ -4,6 +4,24 @@ AVAILABLE_MODELS = [
     "rmbg20"
 ]
 
+# Model input resolution per speed/quality tier, both models are trained at 1024
+RESOLUTION_TIERS = {
+    "fast": 512,
+    "balanced": 768,
+    "quality": 1024
+}
+DEFAULT_RESOLUTION_TIER = "quality"
+
+# Inference backends and weight precisions, see src/utils/backends.py and src/utils/quantization.py
+BACKENDS = {
+    "torch": "PyTorch",
+    "onnx": "ONNX Runtime"
+}
+PRECISIONS = ["float", "int8"]
+
+# Loaded models are kept in memory until they exceed this budget (rmbg14 ~180MB, rmbg20 ~900MB)
+MODEL_CACHE_BUDGET_MB = 2048
+
 MODELS_CONFIG = {
     "rmbg14": {
         "files": [
@@ -13,7 +31,10 @@ MODELS_CONFIG = {
             "MyConfig.py"
         ],
         'repoId': 'regitBT/rmbg14fork',
-        'repoType': 'model'
+        'repoType': 'model',
+        'mean': [0.5, 0.5, 0.5],
+        'std': [1.0, 1.0, 1.0],
+        'torch_int8': False  # convolutions only, torch dynamic quantization leaves it float
     },
     "rmbg20": {
         "files": [
@@ -23,6 +44,9 @@ MODELS_CONFIG = {
             "birefnet.py"
         ],
         'repoId': 'regitBT/rmbg20fork',
-        'repoType': 'model'
+        'repoType': 'model',
+        'mean': [0.485, 0.456, 0.406],
+        'std': [0.229, 0.224, 0.225],
+        'torch_int8': True
     }
 }
\ No newline at end of file
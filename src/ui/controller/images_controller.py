@@ -1,23 +1,42 @@
 import logging
-import shutil, os
+import os
 from PyQt5.QtCore import QObject, pyqtSignal
 from PyQt5.QtWidgets import QFileDialog
 from ..model.images_model import ImagesModel
+from src.utils.result_store import ResultStore
+from src.utils.thumbnail_cache import ThumbnailCache
+from src.utils.export_worker import ExportWorker
 
 class ImagesController(QObject):
     imagesChanged = pyqtSignal()  # emitted whenever the list of images changes
+    imagesInserted = pyqtSignal(int, int)  # first, last row
+    imagesRemoved = pyqtSignal(int, int)  # first, last row
+    imagesReset = pyqtSignal()
 
     def __init__(self, images_model: ImagesModel):
         super().__init__()
         self.images_model = images_model
         self._model_name = None
+        self.export_worker = None
 
         # Forward model signal to controller signal
         self.images_model.imagesChanged.connect(self.imagesChanged)
+        self.images_model.imagesInserted.connect(self.imagesInserted)
+        self.images_model.imagesRemoved.connect(self.imagesRemoved)
+        self.images_model.imagesReset.connect(self.imagesReset)
 
     def get_images(self):
         return self.images_model.get_images()
 
+    def index_of(self, path):
+        return self.images_model.index_of(path)
+
+    def ensure_files(self, paths):
+        """Make sure paths exist on disk, results may still be held in memory only"""
+        for path in paths:
+            ResultStore().ensure_written(path)
+        return paths
+
     def add_images(self, paths):
         """Add one or multiple images (only .png, .jpg, .jpeg allowed)"""
         if not paths:
@@ -39,37 +58,61 @@ class ImagesController(QObject):
         # Filter only valid image files
         filtered = [p for p in paths if p.lower().endswith(valid_exts)]
         if filtered:
-            self.images_model.add_images(filtered)
+            with self.images_model.batch():
+                self.images_model.add_images(filtered)
 
     def clear_images(self):
+        ThumbnailCache().evict(self.images_model.get_images())
+        ResultStore().discard(self.images_model.get_images())
         self.images_model.clear_images()
     
     def save_images(self, widget):
         if not self.images_model.get_images():
             return
-        
+
+        if self.export_worker is not None and self.export_worker.isRunning():
+            logging.warning("An export is already running, cancel it first.")
+            return
+
         if len(self.images_model.get_images()) == 1:
             # Save single image
             image_path = self.images_model.get_images()[0]
-            dest_path, _ = QFileDialog.getSaveFileName(widget, "Save Image", f"{os.path.basename(image_path)}", "Images (*.png)")
+            ext = os.path.splitext(image_path)[1]
+            dest_path, _ = QFileDialog.getSaveFileName(widget, "Save Image", f"{os.path.basename(image_path)}", f"Images (*{ext})")
             if dest_path:
-                try:
-                    shutil.copy(image_path, dest_path)
-                    logging.info("Image saved successfully to " + dest_path)
-                except Exception as e:
-                    logging.error(f"Error occurred while saving image to {dest_path}: {e}")
+                self._export([(image_path, dest_path)])
             return
 
         folder = QFileDialog.getExistingDirectory(widget, "Saving Multiple Images")
         if folder:
-            for image_path in self.images_model.get_images():
-                # Keep original extension
-                dest_path = os.path.join(folder, f"{os.path.basename(image_path)}.png")
-                try:
-                    shutil.copy(image_path, dest_path)
-                    logging.info("Images saved successfully to " + dest_path)
-                except Exception as e:
-                    logging.error(f"Error occurred while saving images to {dest_path}: {e}")
+            # Results already carry the extension of their output format
+            self._export([(image_path, os.path.join(folder, os.path.basename(image_path)))
+                          for image_path in self.images_model.get_images()])
+
+    def cancel_export(self):
+        if self.export_worker is not None and self.export_worker.isRunning():
+            logging.info("Cancelling export.")
+            self.export_worker.cancel()
+
+    def _export(self, files):
+        logging.info(f"Saving {len(files)} image{'s' if len(files) > 1 else ''}.")
+        self._progress_step = max(1, len(files) // 20)
+        self.export_worker = ExportWorker(files)
+        self.export_worker.progress.connect(self._on_export_progress)
+        self.export_worker.done.connect(self._on_export_done)
+        self.export_worker.start()
+
+    def _on_export_progress(self, exported, total):
+        if exported % self._progress_step == 0 or exported == total:
+            logging.info(f"Saved {exported}/{total}")
+
+    def _on_export_done(self, exported, failed, cancelled):
+        if cancelled:
+            logging.info(f"Export cancelled, {exported} images saved.")
+        elif failed:
+            logging.error(f"Saved {exported} images, {failed} failed.")
+        else:
+            logging.info(f"Images saved successfully ({exported}).")
 
     def select_images(self, widget):
         paths, _ = QFileDialog.getOpenFileNames(widget, "Select Images", "", "Images (*.png *.jpg *.jpeg)")
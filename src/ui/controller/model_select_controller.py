@@ -4,13 +4,14 @@ from src.ui.model.selected_model import SelectedModel
 
 class ModelSelectController(QObject):
     def __init__(self, model_select_model: SelectedModel):
+        super().__init__()
         self.model_select_model = model_select_model
 
     def get_available_models(self):
-        return self.model_select_model.get_available_models()
+        return list(AVAILABLE_MODELS)
 
     def get_selected_model(self):
-        return self.model_select_model.get_selected_model()
+        return self.model_select_model.get_model()
 
     def set_selected_model(self, model_name):
-        self.model_select_model.set_selected_model(model_name)
\ No newline at end of file
+        self.model_select_model.set_model(model_name)
\ No newline at end of file
@@ -1,10 +1,18 @@
 import logging
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QMessageBox
 from ..model.images_model import ImagesModel
 
-from src.utils.remove_bg_manager import RemoveBgManager, RemoveBGWorker
-from src.utils.download_manager import ModelDownloadWorker, is_model_downloaded
-from src.utils.temp_imgs_manager import TempImgsManager
+from src.utils.remove_bg_manager import RemoveBgManager
+from src.utils.remove_bg_worker import RemoveBGWorker
+from src.utils.download_manager import is_model_downloaded
+from src.utils.download_worker import ModelDownloadWorker
+from src.utils.model_load_worker import ModelLoadWorker
+from src.utils.result_cache import ResultCache
+from src.utils.output_encoder import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT
+from src.utils.result_store import ResultStore
+from src.utils.thumbnail_cache import ThumbnailCache
+from src.utils.profiler import PROFILES_DIR
 from src.ui.model.selected_model import SelectedModel
 
 class RemoveBgController:
@@ -12,10 +20,26 @@ class RemoveBgController:
         self.source_images_model = source_images_model
         self.res_images_model = res_images_model
         self.selected_model = selected_model
+        self.output_format = DEFAULT_OUTPUT_FORMAT
+        self.worker = None
+        self.load_worker = None
+        self._queued_load = None  # (model name, activate) waiting for the current load
+        self._profile_next_run = False
+        self._pending_results = []  # results not yet added to res_images_model
+
+        # Thumbnails of results that are not written yet are scaled from memory
+        ThumbnailCache().set_provider(ResultStore().preview)
+
 
     def remove_backgrounds(self):
-        # Clear previous results
+        if self.worker is not None and self.worker.isRunning():
+            logging.warning("Background removal is already running.")
+            return
+
+        # Clear previous results, the next run reuses their paths
+        ThumbnailCache().evict(self.res_images_model.get_images())
         self.res_images_model.clear_images()
+        ResultStore().clear()
 
         # Check if model is downloaded
         if not is_model_downloaded(self.selected_model.get_model()):
@@ -41,30 +65,122 @@ class RemoveBgController:
             logging.info("No images to process.")
             return
 
-        # Load model
-        try:
-            logging.info(f"Loading model {model_name}.")
-            inference_manager = RemoveBgManager()
-            inference_manager.load_model(model_name)
-        except Exception as e:
-            logging.error(f"Error loading model {model_name}: {e}")
+        # Load model in the background, the run starts once it is current
+        self._load_model(model_name, activate=True)
+
+    def start_preloading(self):
+        """Load the selected model in the background now and whenever another one is chosen.
+
+        Called once the window is shown, so importing torch and reading the
+        weights does not hold up the first paint.
+        """
+        self.selected_model.modelChanged.connect(self.preload_model)
+        self.preload_model(self.selected_model.get_model())
+
+    def preload_model(self, model_name):
+        # Models that still need downloading are only fetched after the user confirms
+        if is_model_downloaded(model_name):
+            self._load_model(model_name, activate=False)
+
+    def _load_model(self, model_name, activate):
+        if self.load_worker is not None and self.load_worker.isRunning():
+            # One load at a time, a queued run is never replaced by a preload
+            if self._queued_load is None or activate or not self._queued_load[1]:
+                self._queued_load = (model_name, activate)
             return
-        
+
+        self.load_worker = ModelLoadWorker(model_name, activate)
+        self.load_worker.progress.connect(logging.info)
+        self.load_worker.loaded.connect(self._on_model_loaded)
+        self.load_worker.failed.connect(self._on_model_load_failed)
+        self.load_worker.finished.connect(self._start_queued_load)
+        self.load_worker.start()
+
+    def _start_queued_load(self):
+        if self._queued_load is not None:
+            model_name, activate = self._queued_load
+            self._queued_load = None
+            self._load_model(model_name, activate)
+
+    def _on_model_loaded(self, model_name, activated):
+        if activated:
+            self._run_removal(model_name)
+
+    def _on_model_load_failed(self, model_name, error):
+        logging.error(f"Error loading model {model_name}: {error}")
+
+    def _run_removal(self, model_name):
+        if self.worker is not None and self.worker.isRunning():
+            logging.warning("Background removal is already running.")
+            return
+
+        inference_manager = RemoveBgManager()
+        logging.info(f"Using model {model_name} (in memory: {', '.join(inference_manager.resident_models())}).")
+
         # Start background removal in a separate thread
         try:
             logging.info("Starting background removal.")
             self.worker = RemoveBGWorker(
                 self.source_images_model.get_images(),
-                inference_manager.remove_background
+                inference_manager,
+                self.output_format,
+                PROFILES_DIR if self._profile_next_run else None
             )
+            self._profile_next_run = False
 
-            self.worker.start()
             self.worker.finished_image.connect(self._on_image_processed)
-            self.worker.done.connect(lambda: logging.info("Background removal completed."))
+            self.worker.done.connect(self._on_removal_done)
+            self.worker.start()
         except Exception as e:
             logging.error(f"Error removing background: {e}")
             return
     
+    def set_execution_profile(self, profile_name):
+        try:
+            RemoveBgManager().set_execution_profile(profile_name)
+            logging.info(f"Execution profile set to {profile_name}, used from the next run.")
+        except Exception as e:
+            logging.error(f"Error setting execution profile {profile_name}: {e}")
+
+    def set_quantized(self, enabled):
+        try:
+            RemoveBgManager().set_precision("int8" if enabled else "float")
+            logging.info(f"Using {'int8 quantized' if enabled else 'float'} weights from the next run.")
+        except Exception as e:
+            logging.error(f"Error changing precision: {e}")
+
+    def set_backend(self, backend):
+        try:
+            RemoveBgManager().set_backend(backend)
+            logging.info(f"Using the {backend} backend from the next run.")
+        except Exception as e:
+            logging.error(f"Error changing backend: {e}")
+
+    def set_resolution_tier(self, tier):
+        try:
+            RemoveBgManager().set_resolution_tier(tier)
+            logging.info(f"Resolution tier set to {tier}.")
+        except Exception as e:
+            logging.error(f"Error setting resolution tier: {e}")
+
+    def set_output_format(self, output_format):
+        self.output_format = output_format
+        logging.info(f"Results will be saved as {OUTPUT_FORMATS[output_format]['label']} from the next run.")
+
+    def profile_next_run(self):
+        self._profile_next_run = True
+        logging.info(f"The next run will be profiled (saved to {PROFILES_DIR}/, result cache not used).")
+
+    def clear_result_cache(self):
+        try:
+            ResultCache().clear()
+        except Exception as e:
+            logging.error(f"Error clearing result cache: {e}")
+
+    def log_resident_models(self):
+        resident = RemoveBgManager().resident_models()
+        logging.info(f"Models in memory: {', '.join(resident) if resident else 'none'}")
+
     def _ask_download(self, parent=None):
         msg_box = QMessageBox(parent)
         msg_box.setIcon(QMessageBox.Question)
@@ -77,11 +193,29 @@ class RemoveBgController:
         ret = msg_box.exec_()  # returns QMessageBox.Yes or QMessageBox.No
         return ret == QMessageBox.Yes
     
-    def _on_image_processed(self, filename, img, count):
-        path = TempImgsManager().save_temp_img(img, f"{filename}_no_bg.png")
-        self.res_images_model.add_images([path])
+    def _on_removal_done(self):
+        self._add_pending_results()
+        logging.info("Background removal completed.")
+        hits, misses = self.worker.pipeline.cache_stats()
+        logging.info(f"Result cache: {hits} hits, {misses} misses")
+        for variant, latency in RemoveBgManager().latency_report().items():
+            logging.info(f"Inference latency ({variant}): {latency:.0f} ms/image")
+
+    def _on_image_processed(self, path, count, thumbnail):
+        # The result lives in the ResultStore, its file is written on drag-out or save
+        ThumbnailCache().put(path, thumbnail)
+        # Results that arrive in the same event loop pass become one insertion in the view
+        if not self._pending_results:
+            QTimer.singleShot(0, self._add_pending_results)
+        self._pending_results.append(path)
         logging.info(f"Processed image {count+1}/{len(self.source_images_model.get_images())}")
 
+    def _add_pending_results(self):
+        paths, self._pending_results = self._pending_results, []
+        with self.res_images_model.batch():
+            for path in paths:
+                self.res_images_model.add_images([path])
+
 msg_box_style = """
     background-color: #353535;
     color: #eaeaea;
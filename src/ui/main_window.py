@@ -1,12 +1,15 @@
 import logging
 import sys
 from PyQt5.QtWidgets import (
-    QMainWindow, QApplication, QHBoxLayout, QWidget, QVBoxLayout, QSplitter
+    QMainWindow, QApplication, QHBoxLayout, QWidget, QVBoxLayout, QSplitter, QActionGroup
 )
 from PyQt5.QtCore import Qt
 from PyQt5 import QtGui, QtCore
 
 from src.ui.model.selected_model import SelectedModel
+from src.utils.execution_profile import EXECUTION_PROFILES, DEFAULT_PROFILE
+from src.utils.output_encoder import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT
+from src.models_data import BACKENDS, RESOLUTION_TIERS, DEFAULT_RESOLUTION_TIER
 from .view.button_widget import ButtonWidget
 from .view.images_panel_widget import ImagesPanelWidget
 from .view.drop_mask_widget import DropMask
@@ -94,6 +97,18 @@ class MainWindow(QMainWindow):
         remove_bg.triggered.connect(self.remove_bg_controller.remove_backgrounds)
         save_results = files_menu.addAction("Save Results")
         save_results.triggered.connect(lambda: self.res_images_controller.save_images(self))
+        cancel_save = files_menu.addAction("Cancel Saving")
+        cancel_save.triggered.connect(self.res_images_controller.cancel_export)
+        format_menu = files_menu.addMenu("Output Format")
+        format_group = QActionGroup(self)
+        for output_format, fmt in OUTPUT_FORMATS.items():
+            format_action = format_menu.addAction(fmt["label"])
+            format_action.setCheckable(True)
+            format_action.setChecked(output_format == DEFAULT_OUTPUT_FORMAT)
+            format_action.triggered.connect(lambda _, name=output_format: self.remove_bg_controller.set_output_format(name))
+            format_group.addAction(format_action)
+        clear_cache = files_menu.addAction("Clear Result Cache")
+        clear_cache.triggered.connect(self.remove_bg_controller.clear_result_cache)
         files_menu.addSeparator()
         exit_action = files_menu.addAction("Exit")
         exit_action.triggered.connect(self.close)
@@ -105,17 +120,48 @@ class MainWindow(QMainWindow):
         model20.setCheckable(True)
         def select_model(action):
             if action == model14:
-                # self.model_type_controller.set_model("rmbg14")
+                self.selected_model_controller.set_selected_model("rmbg14")
                 model14.setChecked(True)
                 model20.setChecked(False)
             else:
-                # self.model_type_controller.set_model("rmbg20")
+                self.selected_model_controller.set_selected_model("rmbg20")
                 model14.setChecked(False)
                 model20.setChecked(True)
         select_model(model14)  # default
         model14.triggered.connect(lambda: select_model(model14))
         model20.triggered.connect(lambda: select_model(model20))
         model_menu.addSeparator()
+        quality_menu = model_menu.addMenu("Quality")
+        quality_group = QActionGroup(self)
+        for tier, size in RESOLUTION_TIERS.items():
+            tier_action = quality_menu.addAction(f"{tier.capitalize()} ({size}px)")
+            tier_action.setCheckable(True)
+            tier_action.setChecked(tier == DEFAULT_RESOLUTION_TIER)
+            tier_action.triggered.connect(lambda _, name=tier: self.remove_bg_controller.set_resolution_tier(name))
+            quality_group.addAction(tier_action)
+        profile_menu = model_menu.addMenu("Execution Profile")
+        profile_group = QActionGroup(self)
+        for profile_name, profile in EXECUTION_PROFILES.items():
+            profile_action = profile_menu.addAction(profile["label"])
+            profile_action.setCheckable(True)
+            profile_action.setChecked(profile_name == DEFAULT_PROFILE)
+            profile_action.triggered.connect(lambda _, name=profile_name: self.remove_bg_controller.set_execution_profile(name))
+            profile_group.addAction(profile_action)
+        backend_menu = model_menu.addMenu("Backend")
+        backend_group = QActionGroup(self)
+        for backend, label in BACKENDS.items():
+            backend_action = backend_menu.addAction(label)
+            backend_action.setCheckable(True)
+            backend_action.setChecked(backend == "torch")
+            backend_action.triggered.connect(lambda _, name=backend: self.remove_bg_controller.set_backend(name))
+            backend_group.addAction(backend_action)
+        quantized = model_menu.addAction("Quantized (int8)")
+        quantized.setCheckable(True)
+        quantized.toggled.connect(self.remove_bg_controller.set_quantized)
+        loaded_models = model_menu.addAction("Show Loaded Models")
+        loaded_models.triggered.connect(self.remove_bg_controller.log_resident_models)
+        profile_run = model_menu.addAction("Profile Next Run")
+        profile_run.triggered.connect(self.remove_bg_controller.profile_next_run)
         
         # Add actions to the help menu
         open_github = help_menu.addAction("See on GitHub")
@@ -0,0 +1,90 @@
+import os
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QMimeData, Qt, QUrl
+
+from src.utils.thumbnail_cache import ThumbnailCache
+
+PathRole = Qt.UserRole + 1
+
+
+class ImagesListModel(QAbstractListModel):
+    """Qt item model over an ImagesController's image list.
+
+    Changes arrive as row ranges from the ImagesModel and are applied as row
+    insertions/removals instead of a full reset, and thumbnails come from the
+    ThumbnailCache, so the view only ever asks for (and decodes) the rows
+    that are visible.
+    """
+
+    def __init__(self, images_controller, parent=None):
+        super().__init__(parent)
+        self.images_controller = images_controller
+        self.thumbnail_size = 128
+        self._paths = []
+
+        self.thumbnail_cache = ThumbnailCache()
+        self.thumbnail_cache.thumbnailReady.connect(self._on_thumbnail_ready)
+        self.images_controller.imagesInserted.connect(self._on_inserted)
+        self.images_controller.imagesRemoved.connect(self._on_removed)
+        self.images_controller.imagesReset.connect(self.reset)
+        self.reset()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        path = self._paths[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.DecorationRole:
+            # None while loading; the delegate draws a placeholder
+            return self.thumbnail_cache.get(path, self.thumbnail_size)
+        if role in (Qt.ToolTipRole, PathRole):
+            return path
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def supportedDragActions(self):
+        return Qt.CopyAction
+
+    def mimeTypes(self):
+        return ["text/uri-list"]
+
+    def mimeData(self, indexes):
+        mime_data = QMimeData()
+        # Important: set URLs for file drag (desktop/file system)
+        paths = self.images_controller.ensure_files([self._paths[i.row()] for i in indexes if i.isValid()])
+        mime_data.setUrls([QUrl.fromLocalFile(path) for path in paths])
+        return mime_data
+
+    def set_thumbnail_size(self, size: int):
+        if size != self.thumbnail_size:
+            self.thumbnail_size = size
+            if self._paths:
+                self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1), [Qt.DecorationRole])
+
+    def reset(self):
+        self.beginResetModel()
+        self._paths = list(self.images_controller.get_images())
+        self.endResetModel()
+
+    def _on_inserted(self, first, last):
+        self.beginInsertRows(QModelIndex(), first, last)
+        self._paths[first:first] = self.images_controller.get_images()[first:last + 1]
+        self.endInsertRows()
+
+    def _on_removed(self, first, last):
+        self.beginRemoveRows(QModelIndex(), first, last)
+        del self._paths[first:last + 1]
+        self.endRemoveRows()
+
+    def _on_thumbnail_ready(self, path):
+        row = self.images_controller.index_of(path)
+        if row is not None and row < len(self._paths) and self._paths[row] == path:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
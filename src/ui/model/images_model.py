@@ -1,28 +1,118 @@
+from contextlib import contextmanager
 from PyQt5.QtCore import QObject, pyqtSignal
 
+REINDEX_AFTER = 1024  # removals before stale rows are re-indexed in one pass
+
 class ImagesModel(QObject):
     imagesChanged = pyqtSignal()  # signal emitted when images list changes
+    imagesInserted = pyqtSignal(int, int)  # first, last row (inclusive) of inserted images
+    imagesRemoved = pyqtSignal(int, int)  # first, last row (inclusive) of removed images
+    imagesReset = pyqtSignal()  # too many changes to describe as one range, re-read everything
 
     def __init__(self):
         super().__init__()
         self._images = []
+        self._rows = {}  # path -> row, valid for rows < self._rows_valid
+        self._rows_valid = 0
+        self._removed = 0  # removals since the last re-index, bounds how far a stale row can be off
+        self._snapshot = ()  # cached immutable copy returned by get_images
+        self._snapshot_stale = False
+        self._batch_depth = 0
+        self._pending = []  # change ranges collected while batching
 
     def get_images(self):
-        return list(self._images)
+        """Images in order, as a tuple shared until the next change"""
+        if self._snapshot_stale:
+            self._snapshot = tuple(self._images)
+            self._snapshot_stale = False
+        return self._snapshot
+
+    def __len__(self):
+        return len(self._images)
+
+    def __contains__(self, path):
+        return self.index_of(path) is not None
+
+    def index_of(self, path):
+        """Row of path or None"""
+        row = self._rows.get(path)
+        if row is None or row < self._rows_valid:
+            return row
+        if self._removed <= REINDEX_AFTER:
+            # Rows past a removal only shift down, by at most the number of removals
+            return self._images.index(path, max(0, row - self._removed), row + 1)
+        for i in range(self._rows_valid, len(self._images)):
+            self._rows[self._images[i]] = i
+        self._rows_valid = len(self._images)
+        self._removed = 0
+        return self._rows[path]
+
+    @contextmanager
+    def batch(self):
+        """Group changes so listeners get a single notification at the end"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._emit_pending()
 
     def add_images(self, paths):
         """Add images, ignore duplicates"""
+        first = len(self._images)
         for path in paths:
-            if path not in self._images:
+            if path not in self._rows:
+                self._rows[path] = len(self._images)
                 self._images.append(path)
-        self.imagesChanged.emit()
+        if len(self._images) > first:
+            if self._rows_valid == first:
+                self._rows_valid = len(self._images)
+            self._changed("inserted", first, len(self._images) - 1)
 
     def remove_image(self, path):
-        if path in self._images:
-            self._images.remove(path)
-            self.imagesChanged.emit()
+        row = self.index_of(path)
+        if row is not None:
+            del self._images[row]
+            del self._rows[path]
+            self._rows_valid = min(self._rows_valid, row)
+            self._removed += 1
+            self._changed("removed", row, row)
 
     def clear_images(self):
         if self._images:
+            last = len(self._images) - 1
             self._images.clear()
-            self.imagesChanged.emit()
\ No newline at end of file
+            self._rows.clear()
+            self._rows_valid = 0
+            self._removed = 0
+            self._changed("removed", 0, last)
+
+    def _changed(self, kind, first, last):
+        self._snapshot_stale = True
+        self._pending.append((kind, first, last))
+        if not self._batch_depth:
+            self._emit_pending()
+
+    def _emit_pending(self):
+        if not self._pending:
+            return
+        # Consecutive appends collapse into one range, anything else becomes a reset
+        merged = [self._pending[0]]
+        for kind, first, last in self._pending[1:]:
+            prev_kind, prev_first, prev_last = merged[-1]
+            if kind == prev_kind == "inserted" and first == prev_last + 1:
+                merged[-1] = (kind, prev_first, last)
+            else:
+                merged.append((kind, first, last))
+        self._pending = []
+
+        if len(merged) == 1:
+            kind, first, last = merged[0]
+            if kind == "inserted":
+                self.imagesInserted.emit(first, last)
+            else:
+                self.imagesRemoved.emit(first, last)
+        else:
+            self.imagesReset.emit()
+        self.imagesChanged.emit()
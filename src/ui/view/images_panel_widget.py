@@ -1,10 +1,11 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QScrollArea,
-    QGridLayout, QFrame, QSizePolicy
+    QWidget, QVBoxLayout, QLabel, QListView, QFrame,
+    QAbstractItemView, QStyledItemDelegate, QStyle
 )
-from PyQt5.QtGui import QPixmap, QDrag
-from PyQt5.QtCore import Qt, QTimer, QUrl, QMimeData
+from PyQt5.QtGui import QPixmap, QPixmapCache, QColor, QFont, QPen
+from PyQt5.QtCore import Qt, QTimer, QSize, QRect
 from ..controller.images_controller import ImagesController
+from ..model.images_list_model import ImagesListModel, PathRole
 
 class ImagesPanelWidget(QWidget):
     def __init__(self, images_controller: ImagesController, empty_text="No images selected"):
@@ -12,8 +13,6 @@ class ImagesPanelWidget(QWidget):
         self.images_controller = images_controller
         self.empty_text = empty_text
 
-        self.images_controller.imagesChanged.connect(self.update_images)
-
         self.setStyleSheet(images_panel_style)
 
         # Empty label
@@ -27,20 +26,32 @@ class ImagesPanelWidget(QWidget):
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(self.layout)
 
-        # Scroll area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setFrameShape(QFrame.NoFrame)
-        self.scroll_content = QWidget()
-        self.scroll_layout = QGridLayout()
-        self.scroll_layout.setContentsMargins(0, 0, 0, 0)
-        self.scroll_layout.setSpacing(15)
-        self.scroll_content.setLayout(self.scroll_layout)
-        self.scroll_area.setWidget(self.scroll_content)
-        self.scroll_area.setStyleSheet(scroll_area)
+        # Virtualized grid: the view only paints and requests thumbnails for visible rows,
+        # and the model applies changes as row inserts/removes instead of rebuilding widgets
+        self.list_model = ImagesListModel(self.images_controller, self)
+        self.delegate = ImageTileDelegate()
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.IconMode)
+        self.list_view.setResizeMode(QListView.Adjust)
+        self.list_view.setMovement(QListView.Static)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_view.setDragEnabled(True)
+        self.list_view.setDragDropMode(QAbstractItemView.DragOnly)
+        self.list_view.setDefaultDropAction(Qt.CopyAction)
+        self.list_view.setFrameShape(QFrame.NoFrame)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setModel(self.list_model)
+        self.list_view.setStyleSheet(scroll_area)
+
+        self.list_model.rowsInserted.connect(self.update_images)
+        self.list_model.rowsRemoved.connect(self.update_images)
+        self.list_model.modelReset.connect(self.update_images)
 
         self.layout.addWidget(self.empty_label)
-        self.layout.addWidget(self.scroll_area)
+        self.layout.addWidget(self.list_view)
 
         self.update_images()
 
@@ -53,111 +64,90 @@ class ImagesPanelWidget(QWidget):
         return super().resizeEvent(a0)
 
     def update_images(self):
-        # Clear existing items
-        for i in reversed(range(self.scroll_layout.count())):
-            widget = self.scroll_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        images = self.images_controller.get_images()
+        """Update the empty state and tile size, the rows themselves are managed by the model"""
+        num_of_img = self.list_model.rowCount()
 
-        if not images:
+        if not num_of_img:
             self.empty_label.show()
-            self.scroll_area.hide()
+            self.list_view.hide()
             return
         else:
             self.empty_label.hide()
-            self.scroll_area.show()
+            self.list_view.show()
 
-        # Add images in 3-column grid
+        # Tiles for a 3-column grid
 
-        panel_width = self.scroll_area.viewport().width()
-        panel_height = self.scroll_area.viewport().height()
+        panel_width = self.list_view.viewport().width()
+        panel_height = self.list_view.viewport().height()
 
-        num_of_img = len(images)
         max_width = max(0, panel_width//3-20)
-        columns = 3
 
         if num_of_img <= 3:
             max_width = max(min(max(0, panel_width//num_of_img-20), panel_height-50), 100)
-            columns = max(1, num_of_img)
 
         if panel_width < 450 and num_of_img >= 2:
             max_width = max(min(max(0, panel_width//2-20), panel_height-50), 100)
-            columns = 2
 
         if panel_width < 300 and num_of_img >= 2:
             max_width = max(min(max(0, panel_width//1-20), panel_height-50), 100)
-            columns = 1
-
-        for index, path in enumerate(images):
-            row = index // columns
-            col = index % columns
-
-            container = QWidget()
-            container.setMaximumWidth(max_width)
-            container_layout = QVBoxLayout()
-            container_layout.setContentsMargins(5, 5, 5, 5)
-            container_layout.setSpacing(5)
-            container.setLayout(container_layout)
-
-            # Image
-            image_container = QWidget()
-            image_container.setMaximumSize(max_width, max_width)
-            image_container.setLayout(QVBoxLayout())
-            image_container.layout().setContentsMargins(1, 1, 1, 1)
-            image_container.layout().setAlignment(Qt.AlignCenter)
-            image_label = DraggableImage(path, max_width)
-            image_container.layout().addWidget(image_label)
-            container_layout.addWidget(image_container)
-            container_layout.addStretch()
-
-            # File name
-            filename = path.split('/')[-1] if len(path.split('/')[-1]) < 50 else path.split('/')[-1][:23] + '...' + path.split('/')[-1][-23:]
-            filename = '\u200B'.join(filename)
-            name_label = QLabel(filename)
-            name_label.setAlignment(Qt.AlignCenter)
-            name_label.setWordWrap(True)
-            name_label.setStyleSheet("font-size: 12px; color: #cccccc;")
-            container_layout.addWidget(name_label)
-
-            container.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-            self.scroll_layout.addWidget(container, row, col)
-
-        # Update scroll area size
-        self.scroll_content.setMinimumHeight(self.scroll_layout.sizeHint().height())
-        self.scroll_area.setWidget(self.scroll_content)
-
-
-class DraggableImage(QLabel):
-    def __init__(self, image_path, max_width, parent=None):
+
+        max_width = max(max_width, 50)
+        if max_width != self.delegate.tile_width:
+            self.delegate.tile_width = max_width
+            self.list_model.set_thumbnail_size(max_width)
+            self.list_view.setGridSize(self.delegate.sizeHint(None, None))
+
+
+class ImageTileDelegate(QStyledItemDelegate):
+    """Paints a thumbnail (or a placeholder while it loads) with the file name below"""
+    margin = 5
+    text_height = 34
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.image_path = image_path
-        pixmap = QPixmap(image_path).scaled(max_width, max_width, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-        if pixmap.isNull():
-            pixmap = QPixmap(max_width, max_width)
-            pixmap.fill(Qt.darkGray)
-        
-        self.setPixmap(pixmap)
-        self.setAlignment(Qt.AlignCenter)
-        self.setFixedSize(pixmap.size())
-        self.setStyleSheet("background-color: rgba(0, 0, 0, 0.3);")
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            drag = QDrag(self)
-            mime_data = QMimeData()
-
-            # Important: set URLs for file drag (desktop/file system)
-            mime_data.setUrls([QUrl.fromLocalFile(self.image_path)])
-            drag.setMimeData(mime_data)
-
-            # Optional: show pixmap while dragging
-            drag.setPixmap(self.pixmap())
-            drag.setHotSpot(event.pos())
-
-            drag.exec_(Qt.CopyAction)
+        self.tile_width = 0
+        self.font = QFont()
+        self.font.setPixelSize(12)
+
+    def sizeHint(self, option, index):
+        return QSize(self.tile_width + 4 * self.margin, self.tile_width + self.text_height + 4 * self.margin)
+
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        image_rect = QRect(rect.left(), rect.top(), rect.width(), rect.width())
+
+        painter.save()
+        thumbnail = index.data(Qt.DecorationRole)
+        if thumbnail is None or thumbnail.isNull():
+            painter.fillRect(image_rect.adjusted(self.margin, self.margin, -self.margin, -self.margin), Qt.darkGray)
+        else:
+            pixmap = self._scaled_pixmap(index.data(PathRole), thumbnail, image_rect.width() - 2 * self.margin)
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(image_rect.center())
+            painter.fillRect(target, QColor(0, 0, 0, 77))
+            painter.drawPixmap(target, pixmap)
+
+        if option.state & QStyle.State_Selected:
+            painter.setPen(QPen(QColor("#888888"), 1))
+            painter.drawRect(image_rect.adjusted(0, 0, -1, -1))
+
+        # File name
+        filename = index.data(Qt.DisplayRole)
+        if len(filename) >= 50:
+            filename = filename[:23] + '...' + filename[-23:]
+        text_rect = QRect(rect.left(), image_rect.bottom() + self.margin, rect.width(), self.text_height)
+        painter.setFont(self.font)
+        painter.setPen(QColor("#cccccc"))
+        painter.drawText(text_rect, Qt.AlignHCenter | Qt.AlignTop | Qt.TextWrapAnywhere, filename)
+        painter.restore()
+
+    def _scaled_pixmap(self, path, thumbnail, size):
+        key = f"{path}:{thumbnail.cacheKey()}:{size}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(thumbnail.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
 
 
 images_panel_style = """
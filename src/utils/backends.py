@@ -0,0 +1,219 @@
+import itertools
+import logging
+import os
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoModelForImageSegmentation
+
+from src.models_data import BACKENDS
+from src.utils.model_cache import model_size_bytes
+from src.utils.quantization import quantize_model
+from src.utils.execution_profile import inference_context, memory_format
+
+ONNX_OPSET = 17
+FAST_LOAD_FILENAME = "model_fast.pt"  # inference-ready state dict written on the first load
+FAST_LOAD_FAILED_SUFFIX = ".failed"  # marker next to it when it could not be loaded
+
+
+class MaskOutput(torch.nn.Module):
+    """Wraps a model so it returns only the mask prediction [B, 1, H, W]"""
+
+    def __init__(self, model_name: str, model: torch.nn.Module):
+        super().__init__()
+        self.model_name = model_name
+        self.model = model
+
+    def forward(self, images):
+        if self.model_name == "rmbg14":
+            return self.model(images)[0][0]
+        return self.model(images)[-1].sigmoid()
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_name: str, model: torch.nn.Module, device: torch.device):
+        self.model = MaskOutput(model_name, model)
+        self.device = device
+
+    def size_bytes(self) -> int:
+        return model_size_bytes(self.model)
+
+    def prepare(self, profile: dict):
+        """Apply the parts of an execution profile that live on the model"""
+        self.model.to(memory_format=memory_format(profile))
+
+    def run(self, images: np.ndarray, profile: dict) -> np.ndarray:
+        images = torch.from_numpy(images).to(self.device).contiguous(memory_format=memory_format(profile))
+        with inference_context(profile, self.device):
+            return self.model(images).float().cpu().numpy()
+
+
+class OnnxBackend:
+    """Runs a model exported to ONNX with onnxruntime's CPU execution provider"""
+    name = "onnx"
+
+    def __init__(self, path: str, profile: dict):
+        ort = _import_onnxruntime()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if profile["num_threads"]:
+            options.intra_op_num_threads = profile["num_threads"]
+        if profile["interop_threads"]:
+            options.inter_op_num_threads = profile["interop_threads"]
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.path)
+
+    def prepare(self, profile: dict):
+        # Thread counts are fixed when the session is created
+        pass
+
+    def run(self, images: np.ndarray, profile: dict) -> np.ndarray:
+        return self.session.run(None, {self.input_name: images})[0]
+
+
+def load_torch_model(model_name: str, device: torch.device, fast: bool = True) -> torch.nn.Module:
+    """Float model, from the fast-load artifact when there is an up to date one.
+
+    The first from_pretrained load writes the artifact; `fast=False` always
+    goes through from_pretrained. If the artifact cannot be loaded it is
+    removed and not written again until the model weights change.
+    """
+    model = None
+    fast = fast and not _fast_load_failed(model_name)
+    if fast and _fast_load_is_fresh(model_name):
+        try:
+            model = _fast_load(model_name)
+        except Exception as e:
+            logging.warning(f"Fast load of {model_name} failed, loading the original weights from now on: {e}")
+            _mark_fast_load_failed(model_name, e)
+            fast = False
+
+    if model is None:
+        model = AutoModelForImageSegmentation.from_pretrained(
+            pretrained_model_name_or_path=f'models/{model_name}',
+            trust_remote_code=True,
+            local_files_only=True
+        )
+        if fast:
+            _save_fast_load(model_name, model)
+    return model.eval().to(device)
+
+
+def fast_load_path(model_name: str) -> str:
+    return os.path.join("models", model_name, FAST_LOAD_FILENAME)
+
+
+def _fast_load_is_fresh(model_name: str, path: str = None) -> bool:
+    path = path or fast_load_path(model_name)
+    weights = os.path.join("models", model_name, "model.safetensors")
+    return os.path.isfile(path) and os.path.getmtime(path) >= os.path.getmtime(weights)
+
+
+def _fast_load_failed(model_name: str) -> bool:
+    """The artifact did not load for the current weights, new weights get another try"""
+    return _fast_load_is_fresh(model_name, fast_load_path(model_name) + FAST_LOAD_FAILED_SUFFIX)
+
+
+def _mark_fast_load_failed(model_name: str, error: Exception):
+    path = fast_load_path(model_name)
+    try:
+        with open(path + FAST_LOAD_FAILED_SUFFIX, "w") as f:
+            f.write(f"{error}\n")
+        os.remove(path)
+    except OSError as e:
+        logging.warning(f"Could not disable the fast load of {model_name}: {e}")
+
+
+def _fast_load(model_name: str) -> torch.nn.Module:
+    """Build the model on the meta device and adopt memory-mapped weights.
+
+    Nothing is allocated or initialized for the parameters: with
+    assign=True they become the tensors from torch.load(mmap=True), which
+    are backed by the page cache. Processes that load the same artifact
+    share those pages instead of each holding a private copy.
+    """
+    config = AutoConfig.from_pretrained(f'models/{model_name}', trust_remote_code=True, local_files_only=True)
+    state_dict = torch.load(fast_load_path(model_name), map_location="cpu", mmap=True, weights_only=True)
+    with torch.device("meta"):
+        model = AutoModelForImageSegmentation.from_config(config, trust_remote_code=True)
+    model.load_state_dict(state_dict, strict=True, assign=True)
+
+    # Non-persistent buffers are not in the state dict and would stay on the meta device
+    missing = [name for name, t in itertools.chain(model.named_parameters(), model.named_buffers()) if t.is_meta]
+    if missing:
+        raise RuntimeError(f"{len(missing)} tensors are not in {FAST_LOAD_FILENAME}, e.g. {missing[0]}")
+    return model
+
+
+def _save_fast_load(model_name: str, model: torch.nn.Module):
+    path = fast_load_path(model_name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved {path} for faster loading.")
+    except OSError as e:
+        logging.warning(f"Could not save {path}: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_backend(model_name: str, backend: str, precision: str, device: torch.device, profile: dict):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend {backend} is not available. Choose from {list(BACKENDS)}")
+
+    if backend == "onnx":
+        path = onnx_path(model_name, precision)
+        if not os.path.isfile(path):
+            export_onnx(model_name, precision)
+        return OnnxBackend(path, profile)
+
+    model = load_torch_model(model_name, device)
+    if precision == "int8":
+        model = quantize_model(model_name, model)
+    return TorchBackend(model_name, model, device)
+
+
+def onnx_path(model_name: str, precision: str = "float") -> str:
+    filename = "model.onnx" if precision == "float" else f"model_{precision}.onnx"
+    return os.path.join("models", model_name, filename)
+
+
+def export_onnx(model_name: str, precision: str = "float"):
+    """Export a model to ONNX once, next to its weights in models/<name>/"""
+    float_path = onnx_path(model_name)
+    if not os.path.isfile(float_path):
+        logging.info(f"Exporting {model_name} to ONNX, this only happens once.")
+        model = MaskOutput(model_name, load_torch_model(model_name, torch.device("cpu")))
+        dummy = torch.zeros(1, 3, 1024, 1024)
+        with torch.no_grad():
+            torch.onnx.export(
+                model, dummy, float_path,
+                input_names=["images"], output_names=["mask"],
+                dynamic_axes={
+                    "images": {0: "batch", 2: "height", 3: "width"},
+                    "mask": {0: "batch", 2: "height", 3: "width"}
+                },
+                opset_version=ONNX_OPSET
+            )
+        logging.info(f"Saved {float_path}.")
+
+    if precision == "int8":
+        _import_onnxruntime()
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(float_path, onnx_path(model_name, precision), weight_type=QuantType.QInt8)
+        logging.info(f"Saved {onnx_path(model_name, precision)}.")
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("The ONNX backend needs onnxruntime (pip install onnxruntime)") from e
+    return onnxruntime
@@ -1,25 +1,13 @@
 import os
-from huggingface_hub import snapshot_download
-from PyQt5.QtCore import pyqtSignal, QThread
 from src.models_data import AVAILABLE_MODELS, MODELS_CONFIG
 
 
-class ModelDownloadWorker(QThread):
-    finished = pyqtSignal(str)
-
-    def __init__(self, name: str):
-        super().__init__()
-        self.name = name
-
-    def run(self):
-        download_model(self.name)
-        self.finished.emit(self.name)
-
-
 def download_model(model_name: str):
     if model_name not in MODELS_CONFIG:
         raise ValueError(f"Model {model_name} is not available. Choose from {list(MODELS_CONFIG.keys())}")
 
+    from huggingface_hub import snapshot_download  # slow to import, only needed here
+
     os.makedirs(os.path.join("models", model_name), exist_ok=True)
     snapshot_download(
         repo_id=MODELS_CONFIG[model_name]['repoId'],
@@ -0,0 +1,14 @@
+from PyQt5.QtCore import pyqtSignal, QThread
+from src.utils.download_manager import download_model
+
+
+class ModelDownloadWorker(QThread):
+    finished = pyqtSignal(str)
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def run(self):
+        download_model(self.name)
+        self.finished.emit(self.name)
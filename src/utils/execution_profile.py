@@ -0,0 +1,75 @@
+import contextlib
+import logging
+import os
+
+_HALF_CORES = max(1, (os.cpu_count() or 2) // 2)
+
+# num_threads / interop_threads of None keep torch's defaults
+EXECUTION_PROFILES = {
+    "default": {
+        "label": "Default",
+        "inference_mode": True,
+        "num_threads": None,
+        "interop_threads": None,
+        "channels_last": False,
+        "bfloat16": False
+    },
+    "channels_last": {
+        "label": "Channels Last",
+        "inference_mode": True,
+        "num_threads": None,
+        "interop_threads": None,
+        "channels_last": True,
+        "bfloat16": False
+    },
+    "bfloat16": {
+        "label": "Channels Last + BF16",
+        "inference_mode": True,
+        "num_threads": None,
+        "interop_threads": None,
+        "channels_last": True,
+        "bfloat16": True
+    },
+    "background": {
+        "label": "Background (half the cores)",
+        "inference_mode": True,
+        "num_threads": _HALF_CORES,
+        "interop_threads": 1,
+        "channels_last": False,
+        "bfloat16": False
+    }
+}
+
+DEFAULT_PROFILE = "default"
+
+# torch is imported inside the functions so the profiles can be listed without loading it
+_default_num_threads = None
+
+
+def apply_thread_settings(profile: dict):
+    import torch
+    global _default_num_threads
+    if _default_num_threads is None:
+        _default_num_threads = torch.get_num_threads()
+    torch.set_num_threads(profile["num_threads"] or _default_num_threads)
+    if profile["interop_threads"] and profile["interop_threads"] != torch.get_num_interop_threads():
+        try:
+            torch.set_num_interop_threads(profile["interop_threads"])
+        except RuntimeError:
+            # torch only allows this before the first inter-op parallel work
+            logging.warning("Inter-op thread count can only be set before the first inference, keeping the current one.")
+
+
+def memory_format(profile: dict):
+    import torch
+    return torch.channels_last if profile["channels_last"] else torch.contiguous_format
+
+
+def inference_context(profile: dict, device):
+    """Grad mode and autocast settings for a forward pass on a torch.device"""
+    import torch
+    stack = contextlib.ExitStack()
+    stack.enter_context(torch.inference_mode() if profile["inference_mode"] else torch.no_grad())
+    if profile["bfloat16"]:
+        stack.enter_context(torch.autocast(device_type=device.type, dtype=torch.bfloat16))
+    return stack
@@ -0,0 +1,74 @@
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt5.QtCore import pyqtSignal, QThread
+
+from src.utils.result_store import ResultStore
+
+EXPORT_WORKERS = 4
+
+
+def export_file(src_path: str, dest_path: str):
+    """Put src_path at dest_path with as few full writes as possible.
+
+    Results still held in memory are encoded straight to dest_path. Files
+    already on disk are hard-linked when source and destination share a
+    filesystem, and copied otherwise.
+    """
+    if os.path.abspath(src_path) == os.path.abspath(dest_path):
+        return
+    if ResultStore().export(src_path, dest_path):
+        return
+
+    tmp_path = f"{dest_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        try:
+            os.link(src_path, tmp_path)
+        except OSError:
+            # Different filesystem, or links not supported
+            shutil.copyfile(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ExportWorker(QThread):
+    progress = pyqtSignal(int, int)  # exported so far, total
+    done = pyqtSignal(int, int, bool)  # exported, failed, cancelled
+
+    def __init__(self, files, workers: int = EXPORT_WORKERS):
+        super().__init__()
+        self.files = list(files)  # (source path, destination path)
+        self.workers = workers
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        exported = failed = 0
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="export") as pool:
+            futures = {pool.submit(self._export, src, dest): dest for src, dest in self.files}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    if future.result():
+                        exported += 1
+                        self.progress.emit(exported, len(self.files))
+                except Exception as e:
+                    failed += 1
+                    logging.error(f"Error occurred while saving image to {futures[future]}: {e}")
+                if self._cancel.is_set():
+                    for pending in futures:
+                        pending.cancel()
+        self.done.emit(exported, failed, self._cancel.is_set())
+
+    def _export(self, src_path, dest_path) -> bool:
+        if self._cancel.is_set():
+            return False
+        export_file(src_path, dest_path)
+        return True
@@ -0,0 +1,82 @@
+import os
+import threading
+
+
+class FileLru:
+    """Size limit for a directory of cache files, least recently used first out.
+
+    Files ending in `suffix` count, directly in `directory` or, with
+    `nested`, one level of subdirectories down. Callers mark a file as used
+    with `touch` (its mtime is the last use) and report every file they
+    wrote with `added`. Once the files grow past the limit the least
+    recently used ones are deleted down to 90% of it, so eviction does not
+    run on every write.
+    """
+
+    def __init__(self, directory: str, limit_bytes: int, suffix: str = ".png", nested: bool = False):
+        self.directory = directory
+        self.limit = limit_bytes
+        self.suffix = suffix
+        self.nested = nested
+        self._size = None  # bytes on disk, computed on first write
+        self._lock = threading.Lock()
+
+    def touch(self, path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def size(self, path: str) -> int:
+        """Size of the file at path, 0 if there is none. Stat a file before overwriting it and pass this to added"""
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def added(self, path: str, replaced: int = 0):
+        """Account for a file just written to path over one of `replaced` bytes, evicting past the limit"""
+        with self._lock:
+            if self._size is None:
+                self._size = self.disk_size()
+            else:
+                self._size += os.path.getsize(path) - replaced
+            if self._size > self.limit:
+                self._evict()
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self.entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def entries(self):
+        """(path, size, last used) of every file"""
+        if not os.path.isdir(self.directory):
+            return
+        directories = [self.directory]
+        if self.nested:
+            directories = [sub.path for sub in os.scandir(self.directory) if sub.is_dir()]
+        for directory in directories:
+            for entry in os.scandir(directory):
+                if entry.name.endswith(self.suffix):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def disk_size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def _evict(self):
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        target = self.limit * 0.9
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
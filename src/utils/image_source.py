@@ -0,0 +1,48 @@
+from PIL import Image
+
+
+class SourceImage:
+    """Image file that is decoded at most once at full resolution.
+
+    `reduced` builds the model input from a reduced-resolution decode: JPEGs
+    are scaled in the DCT domain by `Image.draft` (1/2, 1/4 or 1/8) and then
+    shrunk with `Image.reduce`, so a 50 MP photo never gets fully decoded just
+    to become a 1024x1024 tensor. `full` lazily decodes the full-resolution
+    image for the final alpha compositing and keeps that single copy.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with Image.open(path) as im:  # reads the header only
+            self.size = im.size  # (width, height)
+            self.format = im.format
+        self._full = None
+
+    def reduced(self, min_size) -> Image.Image:
+        """RGB image at least min_size (width, height) large, or the full image if it is smaller"""
+        if self._full is not None:
+            im = self._full
+        elif self.format == "JPEG":
+            with Image.open(self.path) as im:
+                im.draft("RGB", tuple(min_size))
+                im.load()
+        else:
+            # No cheap reduced decode for this format, decode once and keep it for compositing
+            im = self.full()
+
+        if im.mode != "RGB":
+            im = im.convert("RGB")  # reduce only handles 8-bit bands, P and 16-bit images would fail
+        factor = min(im.width // min_size[0], im.height // min_size[1])
+        if factor > 1:
+            return im.reduce(factor)
+        return im.copy() if im is self._full else im
+
+    def full(self) -> Image.Image:
+        if self._full is None:
+            with Image.open(self.path) as im:
+                im.load()
+            self._full = im
+        return self._full
+
+    def release(self):
+        self._full = None
@@ -0,0 +1,68 @@
+import logging
+import threading
+from collections import OrderedDict
+
+
+def model_size_bytes(model) -> int:
+    """Memory held by a model's weights and buffers"""
+    # state_dict also covers quantized layers, whose packed weights are not parameters
+    def size(value):
+        if hasattr(value, "element_size"):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(size(v) for v in value)
+        return 0
+    return sum(size(value) for value in model.state_dict().values())
+
+
+class ModelCache:
+    """LRU cache of loaded models keyed by model name.
+
+    Least recently used models are evicted once the total size of the cached
+    models exceeds the memory budget. The most recently added model is always
+    kept, even if it alone is larger than the budget.
+    """
+
+    def __init__(self, memory_budget_mb: int):
+        self._models = OrderedDict()  # name -> (model, size in bytes)
+        self._lock = threading.Lock()
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+
+    def get(self, name: str):
+        with self._lock:
+            if name not in self._models:
+                return None
+            self._models.move_to_end(name)
+            return self._models[name][0]
+
+    def put(self, name: str, model):
+        with self._lock:
+            size = model.size_bytes() if hasattr(model, "size_bytes") else model_size_bytes(model)
+            self._models[name] = (model, size)
+            self._models.move_to_end(name)
+            self._evict()
+
+    def set_memory_budget(self, memory_budget_mb: int):
+        with self._lock:
+            self.memory_budget = memory_budget_mb * 1024 * 1024
+            self._evict()
+
+    def resident_models(self) -> list:
+        """Names of the cached models, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def used_memory(self) -> int:
+        with self._lock:
+            return sum(size for _, size in self._models.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def _evict(self):
+        used = sum(size for _, size in self._models.values())
+        while used > self.memory_budget and len(self._models) > 1:
+            name, (_, size) = self._models.popitem(last=False)
+            used -= size
+            logging.info(f"Unloaded model {name} from memory ({size / 2**20:.0f} MB).")
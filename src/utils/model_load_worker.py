@@ -0,0 +1,40 @@
+import sys
+import time
+from PyQt5.QtCore import pyqtSignal, QThread
+
+from src.utils.remove_bg_manager import RemoveBgManager
+
+
+class ModelLoadWorker(QThread):
+    """Loads and warms up a model off the GUI thread"""
+    progress = pyqtSignal(str)  # status message
+    loaded = pyqtSignal(str, bool)  # model name, whether it was made the current model
+    failed = pyqtSignal(str, str)  # model name, error
+
+    def __init__(self, model_name: str, activate: bool = False):
+        super().__init__()
+        self.model_name = model_name
+        self.activate = activate  # make it the model used by the next run, not just cached
+
+    def run(self):
+        try:
+            manager = RemoveBgManager()
+            if "torch" not in sys.modules:
+                self.progress.emit("Importing inference libraries.")
+                import src.utils.backends  # noqa: F401
+
+            if not manager.is_model_loaded(self.model_name):
+                self.progress.emit(f"Loading model {self.model_name}.")
+                start = time.perf_counter()
+                manager.preload_model(self.model_name)
+                self.progress.emit(f"Model {self.model_name} loaded in {time.perf_counter() - start:.1f} s.")
+
+            start = time.perf_counter()
+            if manager.warm_up(self.model_name):
+                self.progress.emit(f"Warm-up pass took {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+            if self.activate:
+                manager.load_model(self.model_name)
+            self.loaded.emit(self.model_name, self.activate)
+        except Exception as e:
+            self.failed.emit(self.model_name, str(e))
@@ -0,0 +1,80 @@
+import io
+import os
+import threading
+import time
+from PIL import Image
+
+# name -> how results are written. compress_level trades PNG size for encode time (0 = stored, 9 = smallest)
+OUTPUT_FORMATS = {
+    "png": {
+        "label": "PNG",
+        "format": "PNG",
+        "extension": ".png",
+        "options": {"compress_level": 6}
+    },
+    "png_fast": {
+        "label": "PNG (fast, larger files)",
+        "format": "PNG",
+        "extension": ".png",
+        "options": {"compress_level": 1}
+    },
+    "png_raw": {
+        "label": "PNG (uncompressed, for intermediates)",
+        "format": "PNG",
+        "extension": ".png",
+        "options": {"compress_level": 0}
+    },
+    "webp": {
+        "label": "WebP (lossless)",
+        "format": "WEBP",
+        "extension": ".webp",
+        "options": {"lossless": True, "quality": 50, "method": 3}
+    }
+}
+
+DEFAULT_OUTPUT_FORMAT = "png"
+
+
+def output_extension(output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+    return _get_format(output_format)["extension"]
+
+
+def save_image(image: Image.Image, path: str, output_format: str = DEFAULT_OUTPUT_FORMAT, timings: dict = None) -> str:
+    """Encode image to path (without extension) and return the written path"""
+    return write_image(image, path + output_extension(output_format), output_format, timings)
+
+
+def write_image(image: Image.Image, path: str, output_format: str = DEFAULT_OUTPUT_FORMAT, timings: dict = None) -> str:
+    """Encode image to exactly path.
+
+    The file is written under a temporary name and renamed, so anyone
+    notified about the path never sees a half written file. With timings,
+    the image is encoded in memory first so "encode" and "save" (the disk
+    write) are timed separately.
+    """
+    fmt = _get_format(output_format)
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        if timings is None:
+            image.save(tmp_path, fmt["format"], **fmt["options"])
+        else:
+            start = time.perf_counter()
+            encoded = io.BytesIO()
+            image.save(encoded, fmt["format"], **fmt["options"])
+            timings["encode"] = timings.get("encode", 0.0) + time.perf_counter() - start
+
+            start = time.perf_counter()
+            with open(tmp_path, "wb") as f:
+                f.write(encoded.getbuffer())
+            timings["save"] = timings.get("save", 0.0) + time.perf_counter() - start
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _get_format(output_format: str) -> dict:
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format {output_format} is not available. Choose from {list(OUTPUT_FORMATS)}")
+    return OUTPUT_FORMATS[output_format]
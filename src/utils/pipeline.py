@@ -0,0 +1,243 @@
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from src.utils.remove_bg_manager import RemoveBgManager, DEFAULT_BATCH_SIZE
+from src.utils.image_source import SourceImage
+from src.utils.result_cache import ResultCache
+from src.utils.run_stats import RunStats
+
+DECODE_WORKERS = 2
+ENCODE_WORKERS = 2
+
+_DONE = object()  # end of stream marker passed between stages
+
+# Output of the decode stage: model_input is None for cache hits (mask is set) and failures.
+# timings collects stage -> seconds for the image as it moves through the pipeline
+_Decoded = namedtuple("_Decoded", ["source", "model_input", "key", "mask", "timings"])
+
+
+class RemoveBgPipeline:
+    """Bounded decode -> inference -> encode pipeline.
+
+    Decoding/preprocessing and compositing/encoding run in thread pools (PIL
+    releases the GIL while decoding, resizing and encoding) so they overlap
+    with the forward pass, which runs on its own thread. Bounded queues
+    between the stages provide backpressure: at most `queue_size` decoded
+    images and `queue_size` pending encodes exist at any time, no matter how
+    big the input folder is.
+    """
+
+    def __init__(self, manager: RemoveBgManager, save_func, batch_size: int = DEFAULT_BATCH_SIZE,
+                 decode_workers: int = DECODE_WORKERS, encode_workers: int = ENCODE_WORKERS, queue_size: int = None,
+                 result_cache: ResultCache = None, compose: bool = True, stats: RunStats = None, profiler=None):
+        self.manager = manager
+        self.save_func = save_func  # (source path, PIL.Image, timings dict) -> result, called in the encode pool
+        self.stats = stats  # per-image stage timings are recorded here when set
+        self.profiler = profiler  # ProfileCapture whose torch_context wraps the inference thread
+        self.compose = compose  # False passes save_func the full-resolution "L" mask instead of the RGBA image
+        self.result_cache = result_cache  # masks found here skip inference entirely
+        self._cache_counts = (0, 0)
+        self.settings = {}  # manager.settings() at the start of the last run
+        self.batch_size = max(1, batch_size)
+        self.decode_workers = decode_workers
+        self.encode_workers = encode_workers
+        self.queue_size = queue_size or 2 * self.batch_size
+
+    def run(self, image_paths):
+        """Yield (index, path, result of save_func) in input order.
+
+        Result is None when the image failed at any stage (the error is logged).
+        `image_paths` may be a generator, it is consumed lazily. Closing the
+        generator early stops all stages.
+        """
+        if self.result_cache is not None:
+            self._cache_counts = (self.result_cache.hits, self.result_cache.misses)
+        # Settings can change from the GUI during a run, the run keeps the ones it started with
+        self._settings_key = self.manager.settings_key()
+        self._input_size = self.manager.input_size
+        self._profile_name = self.manager.profile_name
+        self.settings = self.manager.settings()
+        stop = threading.Event()
+        decoded = queue.Queue(maxsize=self.queue_size)
+        encoded = queue.Queue(maxsize=self.queue_size)
+        decode_pool = ThreadPoolExecutor(self.decode_workers, thread_name_prefix="decode")
+        encode_pool = ThreadPoolExecutor(self.encode_workers, thread_name_prefix="encode")
+
+        feeder = threading.Thread(target=self._feed, args=(image_paths, decode_pool, decoded, stop), daemon=True)
+        inference = threading.Thread(target=self._infer, args=(decoded, encode_pool, encoded, stop), daemon=True)
+        feeder.start()
+        inference.start()
+
+        try:
+            while True:
+                item = _get(encoded, stop)
+                if item is _DONE or item is None:
+                    break
+                index, image_path, future, timings = item
+                result = None
+                if future is not None:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logging.error(f"Error saving result for {image_path}: {e}")
+                if self.stats is not None:
+                    self.stats.add_image(index, image_path, timings, ok=result is not None)
+                    self.stats.log_summary()
+                yield index, image_path, result
+        finally:
+            stop.set()
+            feeder.join()
+            inference.join()
+            decode_pool.shutdown(wait=True, cancel_futures=True)
+            encode_pool.shutdown(wait=True, cancel_futures=True)
+
+    def cache_stats(self) -> tuple:
+        """(hits, misses) of the result cache during the last run"""
+        if self.result_cache is None:
+            return 0, 0
+        hits, misses = self._cache_counts
+        return self.result_cache.hits - hits, self.result_cache.misses - misses
+
+    def _feed(self, image_paths, decode_pool, decoded, stop):
+        try:
+            for index, image_path in enumerate(image_paths):
+                future = decode_pool.submit(self._decode, image_path)
+                if not _put(decoded, (index, image_path, future), stop):
+                    return
+        except Exception as e:
+            logging.error(f"Error listing images: {e}")
+        finally:
+            _put(decoded, _DONE, stop)
+
+    def _infer(self, decoded, encode_pool, encoded, stop):
+        try:
+            with ExitStack() as profiling:
+                if self.profiler is not None:
+                    try:
+                        profiling.enter_context(self.profiler.torch_context())
+                    except Exception as e:
+                        logging.error(f"Could not profile inference, running without the profiler: {e}")
+                self._infer_batches(decoded, encode_pool, encoded, stop)
+        except Exception as e:
+            logging.error(f"Error profiling inference: {e}")
+        finally:
+            _put(encoded, _DONE, stop)
+
+    def _infer_batches(self, decoded, encode_pool, encoded, stop):
+        batch = []
+        try:
+            while True:
+                item = _get(decoded, stop)
+                if item is _DONE or item is None:
+                    break
+                index, image_path, future = item
+                try:
+                    decoded_item = future.result()
+                except Exception as e:
+                    logging.error(f"Error reading image {image_path}: {e}")
+                    decoded_item = _Decoded(None, None, None, None, {})
+                # Failed images and cache hits stay in the batch as placeholders to keep output order
+                batch.append((index, image_path, decoded_item))
+                # Also flush on length so a long run of cache hits is not held back
+                if (sum(1 for *_, d in batch if d.model_input is not None) >= self.batch_size
+                        or len(batch) >= self.queue_size):
+                    if not self._flush(batch, encode_pool, encoded, stop):
+                        return
+                    batch = []
+            self._flush(batch, encode_pool, encoded, stop)
+        except Exception as e:
+            logging.error(f"Error removing background: {e}")
+
+    def _flush(self, batch, encode_pool, encoded, stop) -> bool:
+        model_inputs = [d.model_input for *_, d in batch if d.model_input is not None]
+        preds = iter([])
+        if model_inputs:
+            batch_timings = {}
+            try:
+                preds = iter(self.manager.predict(model_inputs, batch_timings, self._profile_name))
+            except Exception as e:
+                logging.error(f"Error running model on batch: {e}")
+                batch = [(index, image_path, _Decoded(None, None, None, d.mask, d.timings))
+                         for index, image_path, d in batch]
+            # The forward pass is shared, each image gets an equal share of it
+            for *_, d in batch:
+                if d.model_input is not None:
+                    for stage, seconds in batch_timings.items():
+                        d.timings[stage] = d.timings.get(stage, 0.0) + seconds / len(model_inputs)
+
+        for index, image_path, d in batch:
+            future = None
+            if d.model_input is not None:
+                future = encode_pool.submit(self._finish, image_path, d, next(preds))
+            elif d.mask is not None:
+                future = encode_pool.submit(self._finish, image_path, d, None)
+            if not _put(encoded, (index, image_path, future, d.timings), stop):
+                return False
+        return True
+
+    def _decode(self, image_path):
+        timings = {}
+        key = mask = None
+        if self.result_cache is not None:
+            start = time.perf_counter()
+            key = self.result_cache.key(image_path, self._settings_key)
+            mask = self.result_cache.get(key)
+            timings["decode"] = time.perf_counter() - start  # hashing and reading the cached mask
+        if mask is not None:
+            return _Decoded(SourceImage(image_path), None, key, mask, timings)
+
+        source, model_input = self.manager.load_input(image_path, timings, self._input_size)
+        return _Decoded(source, model_input, key, None, timings)
+
+    def _finish(self, image_path, decoded, pred):
+        timings = decoded.timings
+        mask = decoded.mask
+        if mask is None:
+            if self.manager.needs_guide(pred):
+                _timed(timings, "decode", decoded.source.full)  # full resolution guide, kept for compositing
+            mask = _timed(timings, "postprocess", self.manager.source_mask, decoded.source, pred)
+            if decoded.key is not None:
+                try:
+                    self.result_cache.put(decoded.key, mask)
+                except OSError as e:
+                    logging.warning(f"Could not cache mask for {image_path}: {e}")
+        if not self.compose:
+            decoded.source.release()
+            return self.save_func(image_path, mask, timings)
+        _timed(timings, "decode", decoded.source.full)
+        image = _timed(timings, "composite", self.manager.apply_mask, decoded.source, mask)
+        return self.save_func(image_path, image, timings)
+
+
+def _timed(timings: dict, stage: str, func, *args):
+    """func(*args), adding the seconds it took to timings[stage]"""
+    start = time.perf_counter()
+    result = func(*args)
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+    return result
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Blocking get that returns None once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
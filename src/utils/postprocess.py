@@ -0,0 +1,104 @@
+import numpy as np
+from PIL import Image
+
+GUIDED_RADIUS = 4  # box radius at model resolution
+GUIDED_EPS = 1e-3
+STRIP_ROWS = 128  # output rows produced per step by guided_alpha
+
+
+def normalize_pred(pred: np.ndarray, min_max: bool = False) -> np.ndarray:
+    """Model-resolution prediction as float32 [H, W] in 0..1"""
+    mask = np.squeeze(pred).astype(np.float32, copy=False)
+    if min_max:
+        mi, ma = mask.min(), mask.max()
+        mask = (mask - mi) / max(ma - mi, 1e-8)
+    return np.clip(mask, 0.0, 1.0)
+
+
+def mask_to_alpha(pred: np.ndarray, size=None, min_max: bool = False) -> Image.Image:
+    """Turn a model-resolution prediction into a uint8 alpha of the given (width, height).
+
+    All float math (optional min/max normalization, scaling to 0-255) happens
+    at model resolution. The upsampling works on the uint8 mask, so the only
+    full-size buffer is the 1 byte per pixel alpha itself and peak memory no
+    longer grows with float buffers the size of the output image.
+    """
+    mask = (normalize_pred(pred, min_max) * 255).astype(np.uint8)
+    alpha = Image.fromarray(mask, mode="L")
+    if size is not None and alpha.size != tuple(size):
+        alpha = alpha.resize(tuple(size), Image.BILINEAR)
+    return alpha
+
+
+def guided_alpha(pred: np.ndarray, image: Image.Image, min_max: bool = False,
+                 radius: int = GUIDED_RADIUS, eps: float = GUIDED_EPS) -> Image.Image:
+    """Upsample a low-resolution prediction to the size of `image`, snapping edges to it.
+
+    Fast guided filter (He & Sun, 2015): the linear coefficients a, b of
+    q = a * I + b are fitted at model resolution against a downscaled gray
+    guide, then bilinearly upsampled and applied to the full-resolution gray
+    image. The output is produced STRIP_ROWS rows at a time, so besides the
+    uint8 alpha and gray guide only strip-sized float buffers exist.
+    """
+    mask = normalize_pred(pred, min_max)
+    h, w = mask.shape
+    gray = image.convert("L") if image.mode not in ("L", "LA") else image.getchannel(0)
+    guide = np.asarray(gray.resize((w, h), Image.BILINEAR), dtype=np.float32) / 255.0
+
+    mean_i = _box(guide, radius)
+    mean_p = _box(mask, radius)
+    cov_ip = _box(guide * mask, radius) - mean_i * mean_p
+    var_i = _box(guide * guide, radius) - mean_i * mean_i
+    a = cov_ip / (var_i + eps)
+    b = mean_p - a * mean_i
+    mean_a = _box(a, radius)
+    mean_b = _box(b, radius)
+
+    width, height = image.size
+    x0, x1, wx = _bilinear_indices(w, width)
+    y0, y1, wy = _bilinear_indices(h, height)
+    alpha = np.empty((height, width), dtype=np.uint8)
+    for top in range(0, height, STRIP_ROWS):
+        rows = slice(top, min(top + STRIP_ROWS, height))
+        full_gray = np.asarray(gray.crop((0, rows.start, width, rows.stop)), dtype=np.float32) / 255.0
+        strip_a = _resample_rows(mean_a, y0[rows], y1[rows], wy[rows], x0, x1, wx)
+        strip_b = _resample_rows(mean_b, y0[rows], y1[rows], wy[rows], x0, x1, wx)
+        strip = strip_a * full_gray + strip_b
+        alpha[rows] = np.clip(strip * 255, 0, 255).astype(np.uint8)
+    return Image.fromarray(alpha, mode="L")
+
+
+def apply_alpha(image: Image.Image, mask: Image.Image) -> Image.Image:
+    """image with mask as its alpha channel, in place when the mode allows it"""
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGB")
+    image.putalpha(mask)
+    return image
+
+
+def _box(x: np.ndarray, r: int) -> np.ndarray:
+    """Mean over a (2r+1) x (2r+1) window, with windows clipped at the borders"""
+    h, w = x.shape
+    integral = np.zeros((h + 1, w + 1), dtype=np.float64)
+    integral[1:, 1:] = np.cumsum(np.cumsum(x, axis=0, dtype=np.float64), axis=1)
+    ys0 = np.clip(np.arange(h) - r, 0, h)
+    ys1 = np.clip(np.arange(h) + r + 1, 0, h)
+    xs0 = np.clip(np.arange(w) - r, 0, w)
+    xs1 = np.clip(np.arange(w) + r + 1, 0, w)
+    total = (integral[ys1][:, xs1] - integral[ys0][:, xs1]
+             - integral[ys1][:, xs0] + integral[ys0][:, xs0])
+    area = np.outer(ys1 - ys0, xs1 - xs0)
+    return (total / area).astype(np.float32)
+
+
+def _bilinear_indices(src: int, dst: int):
+    """Source indices and weights for half-pixel-centered bilinear resampling"""
+    pos = np.clip((np.arange(dst, dtype=np.float32) + 0.5) * src / dst - 0.5, 0, src - 1)
+    i0 = np.floor(pos).astype(np.int64)
+    i1 = np.minimum(i0 + 1, src - 1)
+    return i0, i1, (pos - i0).astype(np.float32)
+
+
+def _resample_rows(x, y0, y1, wy, x0, x1, wx) -> np.ndarray:
+    rows = x[y0] * (1 - wy)[:, None] + x[y1] * wy[:, None]
+    return rows[:, x0] * (1 - wx) + rows[:, x1] * wx
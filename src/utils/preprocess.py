@@ -0,0 +1,50 @@
+import threading
+import numpy as np
+from PIL import Image
+
+
+class Preprocessor:
+    """Model input preprocessing shared by all models.
+
+    Images are resized to the model resolution while still uint8 (3 bytes per
+    pixel), and only the small resized array is converted to float: it is
+    written into a preallocated [B, 3, H, W] float32 buffer and normalized in
+    place. The buffer is reused by every batch of the same resolution, so
+    preprocessing allocates nothing per image beyond the uint8 resize.
+    """
+
+    def __init__(self, mean, std):
+        mean = np.asarray(mean, dtype=np.float32)
+        std = np.asarray(std, dtype=np.float32)
+        # (x / 255 - mean) / std == x * scale + offset
+        self._scale = (1.0 / (255.0 * std)).reshape(3, 1, 1)
+        self._offset = (-mean / std).reshape(3, 1, 1)
+        self._buffer = None
+        self._lock = threading.Lock()
+
+    def resize(self, image: Image.Image, size) -> np.ndarray:
+        """Resize an RGB image to the model resolution (width, height). Returns uint8 [H, W, 3]"""
+        if image.size != tuple(size):
+            image = image.resize(tuple(size), Image.BILINEAR)
+        return np.asarray(image.convert("RGB"))
+
+    def normalize(self, arrays: list) -> np.ndarray:
+        """Normalize resized uint8 arrays into the shared float32 buffer. Returns [B, 3, H, W]
+
+        The returned array is a view of the buffer and is overwritten by the
+        next call, so it must be consumed before normalizing the next batch.
+        """
+        with self._lock:
+            height, width = arrays[0].shape[:2]
+            batch = self._get_buffer(len(arrays), height, width)
+            for out, arr in zip(batch, arrays):
+                np.copyto(out, arr.transpose(2, 0, 1))  # uint8 HWC -> float32 CHW
+                out *= self._scale
+                out += self._offset
+            return batch
+
+    def _get_buffer(self, batch_size: int, height: int, width: int) -> np.ndarray:
+        if (self._buffer is None or self._buffer.shape[0] < batch_size
+                or self._buffer.shape[2:] != (height, width)):
+            self._buffer = np.empty((batch_size, 3, height, width), dtype=np.float32)
+        return self._buffer[:batch_size]
@@ -0,0 +1,145 @@
+import logging
+import os
+import sys
+import threading
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILES_DIR = "profiles"  # where GUI runs write their profile
+TOP_N = 30  # rows in each table of the summary
+SAMPLE_INTERVAL = 0.005  # seconds between Python stack samples
+LAYER_DEPTH = 3  # module nesting depth that gets its own range in the trace (MaskOutput.model.<stage>)
+LAYER_PREFIX = "layer: "
+
+
+class ProfileCapture:
+    """Profiles one run with torch.profiler and a Python stack sampler.
+
+    The sampler covers every thread of the process from `__enter__` to
+    `__exit__`. torch.profiler only records operators of the thread it was
+    started in, so `torch_context()` has to be entered by the thread that
+    runs the model (the pipeline's inference thread). Model layers down to
+    LAYER_DEPTH show up as named ranges, so time can be attributed to them
+    and not only to operators.
+
+    On exit a directory profile-<time>/ is written with trace.json (Chrome
+    trace, open in chrome://tracing or Perfetto), summary.txt (top
+    operators by CPU time and memory, top layers, top Python functions) and
+    python-stacks.txt (collapsed stacks for flame graph tools).
+    """
+
+    def __init__(self, directory: str, manager, top_n: int = TOP_N):
+        self.directory = directory
+        self.manager = manager  # the model is looked up when profiling starts, it may still be loading now
+        self.top_n = top_n
+        self.path = None  # output directory, set on exit
+        self._prof = None
+        self._stacks = Counter()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def __enter__(self):
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._sampler.join()
+        try:
+            self.path = self._write()
+            logging.info(f"Profile saved to {self.path}")
+        except OSError as e:
+            logging.warning(f"Could not write profile: {e}")
+        return False
+
+    @contextmanager
+    def torch_context(self):
+        """Record torch operators (with shapes and memory) run by the current thread"""
+        from torch.profiler import profile, ProfilerActivity
+
+        hooks = _add_layer_ranges(getattr(self.manager.model, "model", None))
+        try:
+            with profile(activities=[ProfilerActivity.CPU], record_shapes=True, profile_memory=True) as prof:
+                yield
+            self._prof = prof
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                # Root first, as in the collapsed stack format
+                stack = [f"{os.path.basename(f.filename)}:{f.name}" for f in traceback.extract_stack(frame)]
+                self._stacks[";".join([names.get(ident, str(ident))] + stack)] += 1
+            self._samples += 1
+
+    def _write(self) -> str:
+        path = os.path.join(self.directory, f"profile-{datetime.now():%Y%m%d-%H%M%S}")
+        os.makedirs(path, exist_ok=True)
+
+        lines = []
+        if self._prof is not None:
+            self._prof.export_chrome_trace(os.path.join(path, "trace.json"))
+            events = self._prof.key_averages(group_by_input_shape=True)
+            lines += ["Operators by self CPU time", "",
+                      events.table(sort_by="self_cpu_time_total", row_limit=self.top_n), "",
+                      "Operators by self CPU memory", "",
+                      events.table(sort_by="self_cpu_memory_usage", row_limit=self.top_n), ""]
+            layers = sorted((e for e in self._prof.key_averages() if e.key.startswith(LAYER_PREFIX)),
+                            key=lambda e: e.cpu_time_total, reverse=True)
+            if layers:
+                total = max(e.cpu_time_total for e in layers)
+                lines += ["Layers by total CPU time", ""]
+                lines += [f"{e.cpu_time_total / 1000:10.1f} ms {100 * e.cpu_time_total / total:5.1f}% "
+                          f"{e.count:6d}x  {e.key[len(LAYER_PREFIX):]}" for e in layers[:self.top_n]]
+                lines.append("")
+        else:
+            lines += ["No torch operators were recorded (the onnx backend, or no image needed the model).", ""]
+
+        # Leaf frames of the samples: where the Python threads actually were
+        leaves = Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        lines += [f"Python functions ({self._samples} samples every {SAMPLE_INTERVAL * 1000:.0f} ms, all threads)", ""]
+        lines += [f"{count:8d}  {leaf}" for leaf, count in leaves.most_common(self.top_n)]
+
+        with open(os.path.join(path, "summary.txt"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        with open(os.path.join(path, "python-stacks.txt"), "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+        return path
+
+
+def _add_layer_ranges(model) -> list:
+    """Wrap the forward of every module down to LAYER_DEPTH in a named profiler range, return the hook handles"""
+    import torch
+
+    if not isinstance(model, torch.nn.Module):
+        return []
+
+    hooks = []
+    for name, module in model.named_modules():
+        if name and name.count(".") < LAYER_DEPTH:
+            ranges = []  # open ranges of this module, a stack in case it calls itself
+
+            def enter(_module, _inputs, name=name, ranges=ranges):
+                ranges.append(torch.autograd.profiler.record_function(LAYER_PREFIX + name).__enter__())
+
+            def leave(_module, _inputs, _output, ranges=ranges):
+                if ranges:
+                    ranges.pop().__exit__(None, None, None)
+
+            hooks.append(module.register_forward_pre_hook(enter))
+            hooks.append(module.register_forward_hook(leave))
+    return hooks
@@ -0,0 +1,21 @@
+import logging
+import torch
+
+# Dynamic int8 quantization only covers these layers. Conv layers would need
+# static quantization, which requires calibration data and an FX-traceable
+# model; the remote BriaRMBG/BiRefNet code is neither, so they stay float.
+QUANTIZED_LAYERS = {torch.nn.Linear}
+
+
+def quantize_model(model_name: str, model: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 version of a loaded float model.
+
+    Not cached on disk: loading saved int8 weights still needs the float
+    model and quantize_dynamic to build the quantized modules first, and
+    quantizing the same float weights always gives the same result.
+    """
+    if not any(isinstance(m, tuple(QUANTIZED_LAYERS)) for m in model.modules()):
+        logging.warning(f"Model {model_name} has no layers that support dynamic quantization, using float weights.")
+        return model
+
+    return torch.ao.quantization.quantize_dynamic(model, QUANTIZED_LAYERS, dtype=torch.qint8).eval()
@@ -1,13 +1,22 @@
+import logging
+import threading
+import time
 from PIL import Image
-import torch, os
-import torch.nn.functional as F
-from transformers import AutoModelForImageSegmentation
-from torchvision.transforms.functional import normalize
-from PyQt5.QtCore import pyqtSignal, QThread
-from torchvision import transforms
 import numpy as np
 
-from src.models_data import AVAILABLE_MODELS
+# torch/transformers are only imported once a model is loaded, see load_model and device
+from src.models_data import (
+    AVAILABLE_MODELS, BACKENDS, PRECISIONS, MODELS_CONFIG, MODEL_CACHE_BUDGET_MB, RESOLUTION_TIERS,
+    DEFAULT_RESOLUTION_TIER
+)
+from src.utils.model_cache import ModelCache
+from src.utils.image_source import SourceImage
+from src.utils.preprocess import Preprocessor
+from src.utils.postprocess import mask_to_alpha, guided_alpha, apply_alpha
+from src.utils.execution_profile import EXECUTION_PROFILES, DEFAULT_PROFILE, apply_thread_settings
+
+DEFAULT_BATCH_SIZE = 4
+MODEL_INPUT_SIZE = [1024, 1024]  # native resolution of both models
 
 class RemoveBgManager:
     _instance = None
@@ -19,109 +28,306 @@ class RemoveBgManager:
 
     def __init__(self):
         if not hasattr(self, "_initialized"):  # avoid re-init
-            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self._device = None
             self.model_name = None
             self.model = None
+            self.model_cache = ModelCache(MODEL_CACHE_BUDGET_MB)
+            self._preprocessors = {}  # model name -> Preprocessor
+            self._predict_lock = threading.Lock()
+            self._load_lock = threading.Lock()  # one model load at a time
+            self._warmed_up = set()  # (model, resolution, profile) that had a warm-up pass
+            self.profile_name = DEFAULT_PROFILE  # applied by the next predict, see _apply_profile
+            self._thread_profile = DEFAULT_PROFILE  # profile whose thread settings are in effect
+            self._prepared = None  # (model, profile name) the current model was prepared for
+            self.backend = "torch"  # used by the next load_model
+            self.precision = "float"  # used by the next load_model
+            self.model_variant = None  # backend and precision of the loaded model
+            self.resolution_tier = DEFAULT_RESOLUTION_TIER
+            self._latency = {}  # profile name, backend, precision, resolution -> [forward seconds, images]
             self._initialized = True
 
     def load_model(self, model_name: str):
+        model = self._load(model_name)
+        with self._predict_lock:
+            self.model_name = model_name
+            self.model = model
+            self.model_variant = f"{self.backend}, {self._precision(model_name)}"
+            self._apply_profile(self.profile_name)
+
+    def preload_model(self, model_name: str):
+        """Load model_name into the model cache without making it current, so the next load_model is instant"""
+        self._load(model_name)
+
+    def warm_up(self, model_name: str = None) -> bool:
+        """Run one forward pass on a blank image at the current resolution and profile.
+
+        The first pass pays one-time costs (allocations, kernel selection,
+        lazy initialization in the backend), doing it ahead of time keeps
+        them out of the first image's latency. Returns False if the model
+        was already warmed up for these settings.
+        """
+        model_name = model_name or self.model_name
+        model = self._load(model_name)
+        key = (id(model), self.input_size[0], self.profile_name)
+        if key in self._warmed_up:
+            return False
+
+        width, height = self.input_size
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        with self._predict_lock:
+            model.prepare(self.profile)
+            if model is self.model:
+                self._prepared = (id(model), self.profile_name)
+            model.run(self._get_preprocessor(model_name).normalize([blank]), self.profile)
+        self._warmed_up.add(key)
+        return True
+
+    def _load(self, model_name: str):
+        """Model backend for model_name with the current settings, from the cache or loaded"""
         if model_name not in AVAILABLE_MODELS:
             raise ValueError(f"Model {model_name} is not available. Choose from {AVAILABLE_MODELS}")
 
-        self.model_name = model_name
-        self.model = AutoModelForImageSegmentation.from_pretrained(
-            pretrained_model_name_or_path=f'models/{model_name}',
-            trust_remote_code=True,
-            local_files_only=True
-        )
-        if model_name == "rmbg14":
-            self.model.to(self.device)
-        if model_name == "rmbg20":
-            self.model.eval().to(self.device)
+        with self._load_lock:
+            cache_key = self._cache_key(model_name)
+            model = self.model_cache.get(cache_key)
+            if model is None:
+                from src.utils.backends import load_backend
 
-    def remove_background(self, image_path: str) -> Image.Image:
-        if self.model_name == "rmbg14":
-            return self._remove_bg14(image_path)
-        elif self.model_name == "rmbg20":
-            return self._remove_bg20(image_path)
-        else:
-            raise ValueError(f"Unknown model name: {self.model_name}")
+                precision = self._precision(model_name)
+                # Checked here, in the loading thread: the device is only known once torch is imported
+                if precision == "int8" and self.backend == "torch" and self.device.type != "cpu":
+                    raise ValueError("int8 quantization is only supported on CPU")
+                apply_thread_settings(self.profile)
+                self._thread_profile = self.profile_name
+                model = load_backend(model_name, self.backend, precision, self.device, self.profile)
+                self.model_cache.put(cache_key, model)
+            return model
+
+    @property
+    def device(self):
+        """torch.device used for inference, importing torch on first use"""
+        if self._device is None:
+            import torch
+            self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        return self._device
+
+    def set_precision(self, precision: str):
+        """Choose float or dynamic int8 weights for the next load_model call"""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Precision {precision} is not available. Choose from {PRECISIONS}")
+        self.precision = precision
+
+    def set_backend(self, backend: str):
+        """Choose the inference backend (see BACKENDS) for the next load_model call"""
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend {backend} is not available. Choose from {list(BACKENDS)}")
+        self.backend = backend
+
+    @property
+    def input_size(self) -> list:
+        """Model input (width, height) for the selected resolution tier"""
+        size = RESOLUTION_TIERS[self.resolution_tier]
+        return [size, size]
 
-    def _remove_bg14(self, image_path: str) -> Image.Image:
-        # prepare input
-        orig_im = Image.open(image_path).convert("RGB")
-        orig_im_size = orig_im.size[::-1]  # (height, width)
-        model_input_size = [1024, 1024]
-        image = self._preprocess(orig_im, model_input_size).to(self.device)
-
-        # inference
-        result = self.model(image)
-
-        # post process
-        result_image = self._postprocess(result[0][0], orig_im_size)
-
-        # save result
-        pil_mask_im = Image.fromarray(result_image)
-        orig_image = Image.open(image_path)
-        no_bg_image = orig_image.copy()
-        no_bg_image.putalpha(pil_mask_im)
-
-        return no_bg_image
-
-    def _remove_bg20(self, image_path: str) -> Image.Image:
-        orig_im = Image.open(image_path).convert("RGB")
-        model_input_size = [1024, 1024]
-        transform_image = transforms.Compose([
-            transforms.Resize(model_input_size),
-            transforms.ToTensor(),
-            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
-        ])
-        input_images = transform_image(orig_im).unsqueeze(0).to(self.device)
-
-        with torch.no_grad():
-            preds = self.model(input_images)[-1].sigmoid().cpu()
-        pred = preds[0].squeeze()
-        pred_pil = transforms.ToPILImage()(pred)
-        mask = pred_pil.resize(orig_im.size)
-        orig_im.putalpha(mask)
-
-        return orig_im
-
-    def _preprocess(self, image: Image.Image, model_input_size: list) -> torch.Tensor:
-        im = np.array(image)
-        if len(im.shape) < 3:
-            im = im[:, :, np.newaxis]
-        # orig_im_size=im.shape[0:2]
-        im_tensor = torch.tensor(im, dtype=torch.float32).permute(2,0,1)
-        im_tensor = F.interpolate(torch.unsqueeze(im_tensor,0), size=model_input_size, mode='bilinear')
-        image = torch.divide(im_tensor,255.0)
-        image = normalize(image,[0.5,0.5,0.5],[1.0,1.0,1.0])
+    def set_resolution_tier(self, tier: str):
+        """Trade mask quality for speed, see RESOLUTION_TIERS"""
+        if tier not in RESOLUTION_TIERS:
+            raise ValueError(f"Resolution tier {tier} is not available. Choose from {list(RESOLUTION_TIERS)}")
+        self.resolution_tier = tier
+
+    def _precision(self, model_name: str) -> str:
+        """Precision model_name is loaded with, int8 falls back to float where it would not quantize anything"""
+        if self.precision == "int8" and self.backend == "torch" and not MODELS_CONFIG[model_name]["torch_int8"]:
+            return "float"
+        return self.precision
+
+    def _cache_key(self, model_name: str) -> str:
+        # Same key as float when int8 falls back, so both share one loaded model and its cached results
+        suffixes = [s for s in (self.backend, self._precision(model_name)) if s not in ("torch", "float")]
+        return "-".join([model_name] + suffixes)
+
+    @property
+    def profile(self) -> dict:
+        return EXECUTION_PROFILES[self.profile_name]
+
+    def set_execution_profile(self, profile_name: str):
+        """Select the CPU execution profile (see EXECUTION_PROFILES) used by the next forward pass"""
+        if profile_name not in EXECUTION_PROFILES:
+            raise ValueError(f"Profile {profile_name} is not available. Choose from {list(EXECUTION_PROFILES)}")
+
+        # No lock: this is called from the GUI thread and must not wait for a forward pass.
+        # The next predict applies it, which also keeps torch unloaded until there is a model
+        self.profile_name = profile_name
+
+    def latency_report(self) -> dict:
+        """Average forward-pass latency per image (ms) for every profile/backend/precision/resolution used so far"""
+        return {name: 1000 * seconds / images for name, (seconds, images) in self._latency.items() if images}
+
+    def is_model_loaded(self, model_name: str) -> bool:
+        return self._cache_key(model_name) in self.model_cache.resident_models()
+
+    def resident_models(self) -> list:
+        """Names of the models currently kept in memory"""
+        return self.model_cache.resident_models()
+
+    def set_memory_budget(self, memory_budget_mb: int):
+        self.model_cache.set_memory_budget(memory_budget_mb)
+
+    def remove_background(self, image_path: str) -> Image.Image:
+        _, image = next(self.remove_background_batch([image_path], batch_size=1))
+        if image is None:
+            raise ValueError(f"Could not read image {image_path}")
         return image
 
-    def _postprocess(self, result: torch.Tensor, im_size: list) -> np.ndarray:
-        result = torch.squeeze(F.interpolate(result, size=im_size, mode='bilinear'), 0)
-        ma = torch.max(result)
-        mi = torch.min(result)
-        result = (result-mi)/(ma-mi)
-        im_array = (result*255).permute(1,2,0).cpu().data.numpy().astype(np.uint8)
-        im_array = np.squeeze(im_array)
-        return im_array
-    
-
-class RemoveBGWorker(QThread):
-    finished_image = pyqtSignal(str, Image.Image, int)  # path of processed image
-    done = pyqtSignal()  # all images finished
-
-    def __init__(self, image_paths, remove_bg_func):
-        super().__init__()
-        self.image_paths = image_paths
-        self.remove_bg_func = remove_bg_func
-
-    def run(self):
-        for i, img_path in enumerate(self.image_paths):
-            image = self.remove_bg_func(img_path)  # must return a PIL.Image
-            name = os.path.splitext(os.path.basename(img_path))[0]
-            self.finished_image.emit(name, image, i)
-
-        # Emit done signal when all images are processed
-        self.done.emit()
\ No newline at end of file
+    def remove_background_batch(self, image_paths, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Yield (path, image) for every path, in order.
+
+        Images are stacked batch_size at a time into a single forward pass.
+        `image_paths` may be any iterable (e.g. a generator), it is consumed lazily.
+        Images that cannot be decoded are logged and yielded as (path, None).
+        For overlapping decode/inference/encode see src.utils.pipeline.
+        """
+        self._check_model()
+        batch_size = max(1, batch_size)
+        input_size = self.input_size  # a tier change applies from the next call
+        batch = []
+        for image_path in image_paths:
+            batch.append(image_path)
+            if len(batch) == batch_size:
+                yield from self._run_batch(batch, input_size)
+                batch = []
+        if batch:
+            yield from self._run_batch(batch, input_size)
+
+    def _run_batch(self, image_paths: list, input_size):
+        loaded, indices = [], []
+        for i, image_path in enumerate(image_paths):
+            try:
+                loaded.append(self.load_input(image_path, input_size=input_size))
+                indices.append(i)
+            except Exception as e:
+                logging.error(f"Error reading image {image_path}: {e}")
+
+        results = [None] * len(image_paths)
+        if loaded:
+            preds = self.predict([model_input for _, model_input in loaded])
+            for i, (source, _), pred in zip(indices, loaded, preds):
+                results[i] = self.compose(source, pred)
+
+        yield from zip(image_paths, results)
+
+    # The three stages below are thread-safe with respect to each other, so
+    # load_input and compose can run in worker pools while predict keeps the
+    # model busy.
+
+    def load_input(self, image_path: str, timings: dict = None, input_size=None) -> tuple:
+        """Decode and resize an image. Returns (SourceImage, uint8 model input [H, W, 3])
+
+        Only a reduced-resolution copy is decoded here; the full image is
+        decoded later by compose. Seconds spent are added to timings
+        ("decode", "preprocess") when given. input_size defaults to the
+        current tier; callers processing several images pass the size they
+        started with, so a tier change mid-run cannot mix input sizes.
+        """
+        self._check_model()
+        input_size = input_size or self.input_size
+        start = time.perf_counter()
+        source = SourceImage(image_path)
+        reduced = source.reduced(input_size)
+        decoded = time.perf_counter()
+        model_input = self._get_preprocessor().resize(reduced, input_size)
+        if timings is not None:
+            timings["decode"] = timings.get("decode", 0.0) + decoded - start
+            timings["preprocess"] = timings.get("preprocess", 0.0) + time.perf_counter() - decoded
+        return source, model_input
+
+    def predict(self, model_inputs: list, timings: dict = None, profile_name: str = None) -> np.ndarray:
+        """Run one forward pass over a list of model inputs. Returns predictions [B, 1, H, W]
+
+        Seconds spent on the whole batch are added to timings ("preprocess",
+        "forward") when given. profile_name defaults to the selected
+        profile; runs pass the one they started with.
+        """
+        self._check_model()
+        with self._predict_lock:
+            profile_name = profile_name or self.profile_name
+            self._apply_profile(profile_name)
+            start = time.perf_counter()
+            images = self._get_preprocessor().normalize(model_inputs)
+
+            normalized = time.perf_counter()
+            preds = self.model.run(images, EXECUTION_PROFILES[profile_name])
+            end = time.perf_counter()
+
+            variant = f"{profile_name}, {self.model_variant}, {images.shape[-1]}px"
+            latency = self._latency.setdefault(variant, [0.0, 0])
+            latency[0] += end - normalized
+            latency[1] += len(model_inputs)
+            if timings is not None:
+                timings["preprocess"] = timings.get("preprocess", 0.0) + normalized - start
+                timings["forward"] = timings.get("forward", 0.0) + end - normalized
+            return preds
+
+    def _apply_profile(self, profile_name: str):
+        """Bring the thread settings and the current model in line with a profile. Called under the predict lock"""
+        profile = EXECUTION_PROFILES[profile_name]
+        if self._thread_profile != profile_name:
+            apply_thread_settings(profile)
+            self._thread_profile = profile_name
+        if self._prepared != (id(self.model), profile_name):
+            self.model.prepare(profile)
+            self._prepared = (id(self.model), profile_name)
+
+    def compose(self, source: SourceImage, pred: np.ndarray) -> Image.Image:
+        """Turn a single prediction [1, H, W] into the image with transparent background"""
+        return self.apply_mask(source, self.source_mask(source, pred))
+
+    def source_mask(self, source: SourceImage, pred: np.ndarray) -> Image.Image:
+        """Full-resolution alpha for source from a single prediction [1, H, W]"""
+        return self.mask(pred, source.size, guide=source.full() if self.needs_guide(pred) else None)
+
+    def apply_mask(self, source: SourceImage, mask: Image.Image) -> Image.Image:
+        no_bg_image = source.full()
+        source.release()
+        return apply_alpha(no_bg_image, mask)
+
+    def settings(self) -> dict:
+        """Current model and settings, for run reports"""
+        return {
+            "model": self.model_name,
+            "variant": self.model_variant,
+            "resolution": self.input_size[0],
+            "profile": self.profile_name
+        }
+
+    def settings_key(self) -> str:
+        """Everything about the current setup that changes the computed masks"""
+        return f"{self.model_name}|{self.model_variant}|{self.input_size[0]}|bf16={self.profile['bfloat16']}"
+
+    def mask(self, pred: np.ndarray, size=None, guide: Image.Image = None) -> Image.Image:
+        """uint8 alpha of the given (width, height), or model resolution, for a single prediction [1, H, W]
+
+        Predictions below the native resolution are upsampled with a guided
+        filter when the full-resolution `guide` image is given, which keeps
+        edges sharp for the faster tiers.
+        """
+        # rmbg14 outputs are min/max normalized, rmbg20 outputs already went through sigmoid
+        min_max = self.model_name == "rmbg14"
+        if guide is not None and self.needs_guide(pred) and guide.size == tuple(size):
+            return guided_alpha(pred, guide, min_max=min_max)
+        return mask_to_alpha(pred, size, min_max=min_max)
+
+    def needs_guide(self, pred: np.ndarray) -> bool:
+        """Whether pred is below the native resolution, so its mask is upsampled with the full image as guide"""
+        return pred.shape[-1] < MODEL_INPUT_SIZE[0]
+
+    def _check_model(self):
+        if self.model_name not in AVAILABLE_MODELS or self.model is None:
+            raise ValueError(f"Unknown model name: {self.model_name}")
+
+    def _get_preprocessor(self, model_name: str = None) -> Preprocessor:
+        model_name = model_name or self.model_name
+        if model_name not in self._preprocessors:
+            config = MODELS_CONFIG[model_name]
+            self._preprocessors[model_name] = Preprocessor(config['mean'], config['std'])
+        return self._preprocessors[model_name]
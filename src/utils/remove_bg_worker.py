@@ -0,0 +1,62 @@
+import logging
+import os
+import time
+from contextlib import nullcontext
+from PyQt5.QtCore import pyqtSignal, QThread
+from PyQt5.QtGui import QImage
+
+from src.utils.pipeline import RemoveBgPipeline
+from src.utils.temp_imgs_manager import TempImgsManager
+from src.utils.result_cache import ResultCache
+from src.utils.output_encoder import DEFAULT_OUTPUT_FORMAT
+from src.utils.result_store import ResultStore
+from src.utils.run_stats import RunStats, REPORTS_DIR
+from src.utils.profiler import ProfileCapture
+
+RESULT_THUMBNAIL_SIZE = 256
+
+
+class RemoveBGWorker(QThread):
+    finished_image = pyqtSignal(str, int, QImage)  # temp path of processed image, index, thumbnail
+    done = pyqtSignal()  # all images finished
+
+    def __init__(self, image_paths, inference_manager, output_format=DEFAULT_OUTPUT_FORMAT, profile_dir=None):
+        super().__init__()
+        self.image_paths = image_paths
+        self.output_format = output_format
+        self.stats = RunStats()
+        # A profiled run skips the result cache, cached images would never reach the model
+        self.profiler = ProfileCapture(profile_dir, inference_manager) if profile_dir else None
+        self.pipeline = RemoveBgPipeline(inference_manager, self._save_result,
+                                         result_cache=ResultCache() if self.profiler is None else None, compose=False,
+                                         stats=self.stats, profiler=self.profiler)
+
+    def run(self):
+        # Results arrive in input order, kept in memory until something needs the file
+        with self.profiler if self.profiler is not None else nullcontext():
+            for i, _, result in self.pipeline.run(self.image_paths):
+                if result is not None:
+                    temp_path, thumbnail = result
+                    self.finished_image.emit(temp_path, i, thumbnail)
+
+        self.stats.log_summary(force=True)
+        try:
+            meta = {**self.pipeline.settings, "batch_size": self.pipeline.batch_size,
+                    "output_format": self.output_format}
+            logging.info(f"Run report saved to {self.stats.write_report(REPORTS_DIR, meta)}")
+        except OSError as e:
+            logging.warning(f"Could not write run report: {e}")
+
+        # Emit done signal when all images are processed
+        self.done.emit()
+
+    def _save_result(self, image_path, mask, timings):
+        # Runs in the pipeline's encode pool, off the GUI thread. Only the mask is kept,
+        # the RGBA result is composited when it is shown or saved
+        name = os.path.splitext(os.path.basename(image_path))[0]
+        temp_path = TempImgsManager().temp_path(f"{name}_no_bg", self.output_format)
+        ResultStore().add(temp_path, image_path, mask, self.output_format)
+        start = time.perf_counter()
+        thumbnail = ResultStore().preview(temp_path, RESULT_THUMBNAIL_SIZE)
+        timings["composite"] = time.perf_counter() - start
+        return temp_path, thumbnail
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import os
+import threading
+from PIL import Image
+from src.utils.file_lru import FileLru
+
+RESULT_CACHE_DIR = os.path.join("cache", "masks")
+RESULT_CACHE_LIMIT_MB = 1024
+
+
+class ResultCache:
+    """Persistent cache of computed alpha masks.
+
+    Masks are stored as single-channel PNGs named after a hash of the source
+    file's content and the inference settings, so renamed or copied files
+    still hit and any setting change misses. Files are touched on every hit
+    and the least recently used ones are deleted once the cache grows past
+    its size limit.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, cache_dir: str = RESULT_CACHE_DIR, limit_mb: int = RESULT_CACHE_LIMIT_MB):
+        if not hasattr(self, "_initialized"):  # avoid re-init
+            self.cache_dir = cache_dir
+            self.files = FileLru(cache_dir, limit_mb * 1024 * 1024, nested=True)
+            self.hits = 0
+            self.misses = 0
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    def key(self, image_path: str, settings: str) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(settings.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Cached mask for key, or None"""
+        path = self._path(key)
+        try:
+            with Image.open(path) as im:
+                im.load()
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return im
+
+    def put(self, key: str, mask: Image.Image):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        mask.save(tmp_path, "PNG", compress_level=1)
+        replaced = self.files.size(path)  # the same key can be written twice, e.g. by concurrent runs
+        os.replace(tmp_path, path)  # never leave a half-written mask behind
+        self.files.added(path, replaced)
+
+    def clear(self):
+        self.files.clear()
+        logging.info("Result cache cleared.")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
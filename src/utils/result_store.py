@@ -0,0 +1,162 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from PyQt5.QtGui import QImage
+
+from src.utils.image_source import SourceImage
+from src.utils.output_encoder import write_image, DEFAULT_OUTPUT_FORMAT
+from src.utils.postprocess import apply_alpha
+
+RESULT_MEMORY_LIMIT_MB = 512  # masks beyond this are moved to compressed files in the temp dir
+MASK_FORMAT = "png_fast"  # masks are mostly flat areas, even the fastest PNG level shrinks them a lot
+
+
+class _Result:
+    def __init__(self, source_path: str, mask: Image.Image, output_format: str):
+        self.source_path = source_path
+        self.mask = mask  # full-resolution "L" alpha, None once spilled to mask_path
+        self.mask_path = None
+        self.output_format = output_format
+        self.written = False  # the composited file exists at the result path
+        self.lock = threading.Lock()
+
+    def load_mask(self) -> Image.Image:
+        mask = self.mask
+        if mask is None:
+            with Image.open(self.mask_path) as im:
+                im.load()
+            mask = im
+        return mask
+
+    def image(self) -> Image.Image:
+        """Full-resolution RGBA result, composited on demand"""
+        return apply_alpha(SourceImage(self.source_path).full(), self.load_mask())
+
+    def preview(self, size: int) -> Image.Image:
+        """RGBA result that fits size x size, composited from a reduced decode of the source"""
+        source = SourceImage(self.source_path)
+        scale = size / max(source.size)
+        image = source.reduced((max(1, int(source.size[0] * scale)), max(1, int(source.size[1] * scale))))
+        image.thumbnail((size, size), Image.BILINEAR)
+        mask = self.load_mask().resize(image.size, Image.BILINEAR, reducing_gap=2.0)
+        return apply_alpha(image, mask)
+
+
+class ResultStore:
+    """Keeps finished results as a mask plus a reference to their source image.
+
+    Only the 8-bit alpha is new in a result, so that is all that is stored:
+    in memory while it fits in the memory limit, as a compressed
+    single-channel PNG in the temp dir after that. The RGBA image is
+    composited lazily, at thumbnail size for display and at full size when
+    something needs the file (drag-out, save). The source file must stay in
+    place until then.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, memory_limit_mb: int = RESULT_MEMORY_LIMIT_MB):
+        if not hasattr(self, "_initialized"):  # avoid re-init
+            self._results = {}  # result path -> _Result
+            self._in_memory = OrderedDict()  # results whose mask is in memory, oldest first
+            self._bytes = 0  # of masks in _in_memory
+            self._lock = threading.Lock()
+            self.memory_limit = memory_limit_mb * 1024 * 1024
+            self._initialized = True
+
+    def add(self, path: str, source_path: str, mask: Image.Image, output_format: str = DEFAULT_OUTPUT_FORMAT):
+        """Register the result of source_path that will be written to path when needed"""
+        result = _Result(source_path, mask, output_format)
+        with self._lock:
+            self._drop(path)
+            self._results[path] = result
+            self._in_memory[path] = result
+            self._bytes += _mask_bytes(mask)
+            spill = []
+            # Oldest masks go to disk until the rest fits, the newest always stays
+            while self._bytes > self.memory_limit and len(self._in_memory) > 1:
+                spill_path, spill_result = self._in_memory.popitem(last=False)
+                self._bytes -= _mask_bytes(spill_result.mask)
+                spill.append((spill_path, spill_result))
+        for spill_path, spill_result in spill:
+            self._spill(spill_path, spill_result)
+
+    def preview(self, path: str, size: int):
+        """QImage of a result not written yet that fits size x size, or None"""
+        with self._lock:
+            result = self._results.get(path)
+        if result is None or result.written:
+            return None
+        image = result.preview(size)
+        data = image.tobytes("raw", "RGBA")
+        return QImage(data, image.width, image.height, 4 * image.width, QImage.Format_RGBA8888).copy()
+
+    def ensure_written(self, path: str) -> str:
+        """Write the composited result to path if it only exists as a mask"""
+        with self._lock:
+            result = self._results.get(path)
+        if result is not None:
+            with result.lock:
+                if not result.written:
+                    try:
+                        write_image(result.image(), path, result.output_format)
+                        result.written = True
+                    except OSError as e:
+                        logging.error(f"Error writing result {path}: {e}")
+        return path
+
+    def export(self, path: str, dest_path: str) -> bool:
+        """Composite a result that was never written straight to dest_path.
+
+        Returns False when path is not such a result, the caller then
+        copies the file on disk instead.
+        """
+        with self._lock:
+            result = self._results.get(path)
+        if result is None or result.written:
+            return False
+        write_image(result.image(), dest_path, result.output_format)
+        return True
+
+    def discard(self, paths):
+        with self._lock:
+            for path in paths:
+                self._drop(path)
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._results):
+                self._drop(path)
+
+    def _drop(self, path):
+        result = self._results.pop(path, None)
+        if result is not None:
+            if self._in_memory.pop(path, None) is not None:
+                self._bytes -= _mask_bytes(result.mask)
+            if result.mask_path is not None and os.path.exists(result.mask_path):
+                os.remove(result.mask_path)
+
+    def _spill(self, path, result):
+        with result.lock:
+            mask_path = os.path.splitext(path)[0] + ".mask.png"
+            try:
+                write_image(result.mask, mask_path, MASK_FORMAT)
+                result.mask_path = mask_path
+                result.mask = None
+            except OSError as e:
+                # Keep it in memory, over the limit
+                logging.warning(f"Could not move mask of {path} to disk: {e}")
+                with self._lock:
+                    if self._results.get(path) is result:
+                        self._in_memory[path] = result
+                        self._bytes += _mask_bytes(result.mask)
+
+
+def _mask_bytes(mask) -> int:
+    return mask.width * mask.height if mask is not None else 0
@@ -0,0 +1,115 @@
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+STAGES = ("decode", "preprocess", "forward", "postprocess", "composite", "encode", "save")
+SUMMARY_INTERVAL = 5.0  # seconds between rolling summaries in the log
+REPORTS_DIR = "reports"  # where GUI runs write their JSON/CSV report
+
+
+def current_rss_mb() -> float:
+    """Resident memory of this process, falls back to the peak where the current value is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return max_rss_mb()
+
+
+def max_rss_mb() -> float:
+    """Peak resident memory over the lifetime of this process"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile, q in 0..100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+class RunStats:
+    """Per-image, per-stage timings and memory samples of one run.
+
+    Stages fill a plain dict of stage -> seconds per image (see STAGES);
+    `add_image` records it once the image is done. Thread-safe, so the
+    pipeline's pools can report from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = []  # {"index", "path", "ok", "rss_mb", stage: seconds}
+        self.started = time.perf_counter()
+        self.peak_rss_mb = current_rss_mb()
+        self._last_summary = self.started
+
+    def add_image(self, index: int, path: str, timings: dict, ok: bool = True):
+        rss = current_rss_mb()
+        with self._lock:
+            self.images.append({"index": index, "path": path, "ok": ok, "rss_mb": round(rss, 1), **timings})
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+    def summary(self) -> dict:
+        with self._lock:
+            done = [image for image in self.images if image["ok"]]
+            elapsed = time.perf_counter() - self.started
+            stages = {}
+            for stage in STAGES:
+                values = [image[stage] for image in done if stage in image]
+                if values:
+                    stages[stage] = {
+                        "p50_ms": percentile(values, 50) * 1000,
+                        "p95_ms": percentile(values, 95) * 1000,
+                        "mean_ms": sum(values) / len(values) * 1000
+                    }
+            return {
+                "images": len(done),
+                "failed": len(self.images) - len(done),
+                "seconds": elapsed,
+                "images_per_sec": len(done) / elapsed if elapsed > 0 else 0.0,
+                "peak_rss_mb": self.peak_rss_mb,
+                "max_rss_mb": max_rss_mb(),
+                "stages": stages
+            }
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        stages = ", ".join(f"{stage} {s['p50_ms']:.0f}/{s['p95_ms']:.0f}" for stage, s in summary["stages"].items())
+        return (f"{summary['images']} images, {summary['images_per_sec']:.2f} img/s, "
+                f"peak {summary['peak_rss_mb']:.0f} MB | p50/p95 ms: {stages}")
+
+    def log_summary(self, force: bool = False):
+        """Log the rolling summary, at most every SUMMARY_INTERVAL seconds unless forced"""
+        now = time.perf_counter()
+        if force or now - self._last_summary >= SUMMARY_INTERVAL:
+            self._last_summary = now
+            logging.info(f"Stage timings: {self.format_summary()}")
+
+    def write_report(self, directory: str, meta: dict = None) -> str:
+        """Write run-<timestamp>.json (summary and every image) and .csv (one row per image), return the JSON path"""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"run-{datetime.now():%Y%m%d-%H%M%S}")
+        with self._lock:
+            images = sorted(self.images, key=lambda image: image["index"])
+
+        with open(f"{base}.json", "w") as f:
+            json.dump({"meta": meta or {}, "summary": self.summary(), "images": images}, f, indent=2)
+
+        columns = ["index", "path", "ok", "rss_mb"] + list(STAGES)
+        with open(f"{base}.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, restval="")
+            writer.writeheader()
+            for image in images:
+                writer.writerow({key: image.get(key, "") for key in columns})
+        return f"{base}.json"
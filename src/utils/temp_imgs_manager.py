@@ -1,8 +1,7 @@
 import os, tempfile
 from PIL import Image
 
-import os, tempfile
-from PIL import Image
+from src.utils.output_encoder import save_image, output_extension, DEFAULT_OUTPUT_FORMAT
 
 class TempImgsManager:
     _instance = None
@@ -13,11 +12,14 @@ class TempImgsManager:
             cls._instance.temp_dir = tempfile.TemporaryDirectory()
         return cls._instance
 
-    def save_temp_img(self, image: Image.Image, filename: str) -> str:
-        temp_path = os.path.join(self.temp_dir.name, filename)
-        image.save(temp_path, 'PNG')
-        return temp_path
+    def save_temp_img(self, image: Image.Image, name: str, output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+        """Save image as name + the extension of output_format, return the path"""
+        return save_image(image, os.path.join(self.temp_dir.name, name), output_format)
     
+    def temp_path(self, name: str, output_format: str = DEFAULT_OUTPUT_FORMAT) -> str:
+        """Path save_temp_img would write name to, without writing anything"""
+        return os.path.join(self.temp_dir.name, name + output_extension(output_format))
+
     def clear_temp(self):
         self.temp_dir.cleanup()
         self.temp_dir = tempfile.TemporaryDirectory()
\ No newline at end of file
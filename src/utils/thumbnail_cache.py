@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+from src.utils.file_lru import FileLru
+
+THUMBNAIL_BUCKETS = (128, 256, 512)  # thumbnails are decoded at the smallest bucket >= the tile size
+THUMBNAIL_MEMORY_LIMIT_MB = 256
+THUMBNAIL_DISK_DIR = os.path.join("cache", "thumbnails")  # set to None to disable the disk tier
+THUMBNAIL_DISK_LIMIT_MB = 256
+
+
+class _ThumbnailDisk:
+    """Thumbnail PNGs on disk, least recently used ones deleted past the size limit like the ResultCache"""
+
+    def __init__(self, directory: str, limit_mb: int = THUMBNAIL_DISK_LIMIT_MB):
+        self.directory = directory
+        self.files = FileLru(directory, limit_mb * 1024 * 1024)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.png")
+
+    def read(self, path: str) -> QImage:
+        image = QImage(path) if os.path.isfile(path) else QImage()
+        if not image.isNull():
+            self.files.touch(path)  # mark as recently used
+        return image
+
+    def write(self, path: str, image: QImage):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            if not image.save(tmp_path, "PNG"):
+                return
+            replaced = self.files.size(path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.files.added(path, replaced)
+
+
+class _LoaderSignals(QObject):
+    loaded = pyqtSignal(object, QImage)  # cache key, thumbnail (null if the file could not be read)
+
+
+class _ThumbnailLoader(QRunnable):
+    def __init__(self, key, path: str, bucket: int, disk, disk_path: str, signals: _LoaderSignals, provider=None):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.bucket = bucket
+        self.disk = disk
+        self.disk_path = disk_path
+        self.signals = signals
+        self.provider = provider
+
+    def run(self):
+        # Images that only exist in memory are scaled directly, without touching the disk
+        image = None
+        if self.provider is not None:
+            try:
+                image = self.provider(self.path, self.bucket)
+            except Exception as e:
+                logging.warning(f"Could not build thumbnail for {self.path}: {e}")
+        if image is not None:
+            self.signals.loaded.emit(self.key, image)
+            return
+
+        image = self.disk.read(self.disk_path) if self.disk_path else QImage()
+
+        if image.isNull():
+            reader = QImageReader(self.path)
+            reader.setAutoTransform(True)
+            size = reader.size()
+            if size.isValid() and (size.width() > self.bucket or size.height() > self.bucket):
+                # Lets the JPEG decoder scale in the DCT domain instead of decoding full resolution
+                reader.setScaledSize(size.scaled(QSize(self.bucket, self.bucket), Qt.KeepAspectRatio))
+            image = reader.read()
+            if not image.isNull() and self.disk_path:
+                self.disk.write(self.disk_path, image)
+
+        self.signals.loaded.emit(self.key, image)
+
+
+class ThumbnailCache(QObject):
+    """Size-keyed thumbnail cache filled by background decoders.
+
+    `get` returns a cached thumbnail or None, in which case the thumbnail is
+    decoded on a QThreadPool and `thumbnailReady` is emitted once it is in
+    the cache. Thumbnails live in an LRU memory tier and, optionally, in a
+    size-limited LRU tier on disk so they survive restarts.
+    """
+    thumbnailReady = pyqtSignal(str)  # image path
+    _instance = None
+    _initialized = False  # on the class: instance attributes can't be read before QObject.__init__ ran
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not ThumbnailCache._initialized:  # avoid re-init
+            super().__init__()
+            self._images = OrderedDict()  # key -> QImage
+            self._bytes = 0
+            self._pending = set()
+            self.memory_limit = THUMBNAIL_MEMORY_LIMIT_MB * 1024 * 1024
+            self.disk = _ThumbnailDisk(THUMBNAIL_DISK_DIR) if THUMBNAIL_DISK_DIR else None
+            self.provider = None  # (path, size) -> QImage that fits size x size or None, checked before reading the file
+            self.pool = QThreadPool()
+            self.pool.setMaxThreadCount(max(2, QThreadPool.globalInstance().maxThreadCount() // 2))
+            self._signals = _LoaderSignals()
+            self._signals.loaded.connect(self._on_loaded)
+            ThumbnailCache._initialized = True
+
+    def get(self, path: str, size: int):
+        """Thumbnail of path that fits size x size, or None while it is being loaded"""
+        key = self._key(path, size)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+
+        if key not in self._pending:
+            self._pending.add(key)
+            bucket = key[2]
+            self.pool.start(_ThumbnailLoader(key, path, bucket, self.disk, self._disk_path(key), self._signals,
+                                             self.provider))
+        return None
+
+    def put(self, path: str, image: QImage):
+        """Add a thumbnail produced elsewhere (e.g. from an in-memory result)"""
+        key = self._key(path, max(image.width(), image.height()))
+        self._store(key, image)
+        self.thumbnailReady.emit(path)
+
+    def set_provider(self, provider):
+        """Source for images that are not (yet) files, e.g. results kept in memory"""
+        self.provider = provider
+
+    def evict(self, paths):
+        """Forget every thumbnail of paths, e.g. results whose path is reused by the next run"""
+        paths = set(paths)
+        for key in [key for key in self._images if key[0] in paths]:
+            self._bytes -= self._images.pop(key).sizeInBytes()
+        # Loads still running for these paths are dropped when they finish
+        self._pending = {key for key in self._pending if key[0] not in paths}
+
+    def clear(self):
+        self._images.clear()
+        self._bytes = 0
+
+    def _on_loaded(self, key, image: QImage):
+        if key not in self._pending:
+            return  # evicted while loading
+        self._pending.discard(key)
+        self._store(key, image)
+        self.thumbnailReady.emit(key[0])
+
+    def _store(self, key, image: QImage):
+        if key in self._images:
+            self._bytes -= self._images.pop(key).sizeInBytes()
+        self._images[key] = image
+        self._bytes += image.sizeInBytes()
+        while self._bytes > self.memory_limit and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= evicted.sizeInBytes()
+
+    def _key(self, path: str, size: int):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        bucket = next((b for b in THUMBNAIL_BUCKETS if b >= size), THUMBNAIL_BUCKETS[-1])
+        return path, mtime, bucket
+
+    def _disk_path(self, key):
+        if self.disk is None:
+            return None
+        return self.disk.path(hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest())
@@ -0,0 +1,36 @@
+import os
+import time
+
+import pytest
+
+from src.utils.file_lru import FileLru
+
+
+def test_nested_files_evict_least_recently_used(tmp_path):
+    files = FileLru(str(tmp_path), limit_bytes=250, nested=True)
+    paths = []
+    for i, sub in enumerate(["ab", "cd", "ab"]):
+        os.makedirs(tmp_path / sub, exist_ok=True)
+        path = str(tmp_path / sub / f"{i}.png")
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))  # oldest first
+        paths.append(path)
+        files.added(path)
+
+    # Three files of 100 bytes went over 250, the oldest one was deleted to get under 225
+    assert [os.path.exists(path) for path in paths] == [False, True, True]
+    assert files.disk_size() == 200
+
+
+def test_overwriting_a_mask_does_not_grow_the_cache(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    from src.utils.result_cache import ResultCache
+
+    cache = object.__new__(ResultCache)  # a private instance, not the app's singleton
+    cache.__init__(str(tmp_path))
+    cache.put("abcdef", Image.new("L", (64, 64)))
+    for _ in range(3):
+        cache.put("abcdef", Image.new("L", (64, 64)))
+
+    assert cache.files._size == cache.files.disk_size()
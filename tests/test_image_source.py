@@ -0,0 +1,19 @@
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from src.utils.image_source import SourceImage
+
+
+@pytest.mark.parametrize("mode", ["P", "I;16", "RGBA"])
+def test_reduced_handles_non_rgb_modes(tmp_path, mode):
+    path = str(tmp_path / "large.png")
+    image = Image.new("RGB", (2500, 2300), (10, 200, 30))
+    image = Image.new(mode, image.size, 40000) if mode == "I;16" else image.convert(mode)
+    image.save(path)
+
+    source = SourceImage(path)
+    reduced = source.reduced((1024, 1024))
+    assert reduced.mode == "RGB"
+    assert reduced.size == (1250, 1150)
+    assert source.full().mode == Image.open(path).mode  # the original is kept for compositing
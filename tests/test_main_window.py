@@ -0,0 +1,65 @@
+"""Smoke test: the main window can be built and shown without a display."""
+import pytest
+
+pytest.importorskip("PyQt5")
+
+
+def test_main_window_constructs_offscreen(app):
+    from src.ui.main_window import MainWindow
+
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    assert window.isVisible()
+    window.close()
+
+
+def test_model_preload_waits_for_start_preloading(app, monkeypatch):
+    from src.ui import main_window
+    from src.ui.controller import remove_bg_controller
+
+    started = []
+
+    class RecordingLoadWorker:
+        def __init__(self, model_name, activate):
+            started.append(model_name)
+            self.progress = self.loaded = self.failed = self.finished = self
+
+        def connect(self, slot):
+            pass
+
+        def start(self):
+            pass
+
+        def isRunning(self):
+            return False
+
+    monkeypatch.setattr(remove_bg_controller, "is_model_downloaded", lambda name: True)
+    monkeypatch.setattr(remove_bg_controller, "ModelLoadWorker", RecordingLoadWorker)
+
+    window = main_window.MainWindow()
+    assert started == []  # selecting the default model while building the window loads nothing
+
+    window.remove_bg_controller.start_preloading()
+    assert started == ["rmbg14"]
+    window.close()
+
+
+def test_results_arriving_together_are_inserted_once(app):
+    from PyQt5.QtGui import QImage
+    from src.ui.controller.remove_bg_controller import RemoveBgController
+    from src.ui.model.images_model import ImagesModel
+    from src.ui.model.selected_model import SelectedModel
+
+    source, results = ImagesModel(), ImagesModel()
+    source.add_images(["a.png", "b.png", "c.png"])
+    controller = RemoveBgController(source, results, SelectedModel())
+    inserted = []
+    results.imagesInserted.connect(lambda first, last: inserted.append((first, last)))
+
+    for i, path in enumerate(["a_no_bg.png", "b_no_bg.png", "c_no_bg.png"]):
+        controller._on_image_processed(path, i, QImage(8, 8, QImage.Format_RGBA8888))
+    assert inserted == []
+    app.processEvents()
+    assert inserted == [(0, 2)]
+    assert results.get_images() == ("a_no_bg.png", "b_no_bg.png", "c_no_bg.png")
@@ -0,0 +1,31 @@
+"""The ONNX export returns the same masks as the torch model it was exported from."""
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnx")  # used by torch.onnx.export
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")  # imported by src.utils.backends
+
+from benchmarks.standin_models import torch_standin
+from src.utils import backends
+from src.utils.execution_profile import DEFAULT_PROFILE, EXECUTION_PROFILES
+
+
+@pytest.mark.parametrize("model_name", ["rmbg14", "rmbg20"])
+def test_onnx_export_matches_torch(model_name, tmp_path, monkeypatch):
+    profile = EXECUTION_PROFILES[DEFAULT_PROFILE]
+    torch_backend = torch_standin(model_name)
+    # export_onnx writes models/<name>/model.onnx from the float torch model
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models" / model_name).mkdir(parents=True)
+    monkeypatch.setattr(backends, "load_torch_model", lambda name, device, fast=True: torch_backend.model.model)
+
+    onnx_backend = backends.load_backend(model_name, "onnx", "float", torch.device("cpu"), profile)
+
+    # Not the export size, the axes are dynamic like the resolution tiers
+    images = np.random.default_rng(0).standard_normal((2, 3, 512, 384)).astype(np.float32)
+    expected = torch_backend.run(images, profile)
+    actual = onnx_backend.run(images, profile)
+    assert actual.shape == expected.shape == (2, 1, 512, 384)
+    np.testing.assert_allclose(actual, expected, atol=1e-4)
@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+pytest.importorskip("numpy")
+
+from benchmarks.standin_models import install_standin
+from src.models_data import DEFAULT_RESOLUTION_TIER, RESOLUTION_TIERS
+from src.utils.execution_profile import DEFAULT_PROFILE, EXECUTION_PROFILES
+from src.utils.pipeline import RemoveBgPipeline
+from src.utils.remove_bg_manager import RemoveBgManager
+
+
+@pytest.fixture
+def manager():
+    manager = RemoveBgManager()
+    install_standin(manager, "numpy", "rmbg14")
+    yield manager
+    manager.set_resolution_tier(DEFAULT_RESOLUTION_TIER)
+    manager.set_execution_profile(DEFAULT_PROFILE)
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(6):
+        path = str(tmp_path / f"{i}.jpg")
+        Image.new("RGB", (320, 240), (40 * i, 80, 120)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_tier_change_during_run_keeps_the_run_tier(manager, images):
+    shapes = []
+    run = manager.model.run
+    manager.model.run = lambda batch, profile: shapes.append(batch.shape[-2:]) or run(batch, profile)
+    other_tier = next(tier for tier in RESOLUTION_TIERS if tier != DEFAULT_RESOLUTION_TIER)
+
+    def paths():
+        yield images[0]
+        manager.set_resolution_tier(other_tier)  # as if changed from the menu mid-run
+        yield from images[1:]
+
+    try:
+        pipeline = RemoveBgPipeline(manager, lambda path, mask, timings: mask, batch_size=2, compose=False)
+        results = list(pipeline.run(paths()))
+    finally:
+        del manager.model.run
+
+    size = RESOLUTION_TIERS[DEFAULT_RESOLUTION_TIER]
+    assert all(mask is not None and mask.size == (320, 240) for *_, mask in results)
+    assert set(shapes) == {(size, size)}
+    assert pipeline.settings["resolution"] == size
+
+
+def test_profile_change_does_not_wait_for_a_forward_pass(manager):
+    # The GUI thread sets the profile while a forward pass holds the predict lock
+    setter = threading.Thread(target=manager.set_execution_profile, args=("channels_last",), daemon=True)
+    with manager._predict_lock:
+        setter.start()
+        setter.join(timeout=5)
+        assert not setter.is_alive()
+    assert manager.profile_name == "channels_last"
+
+
+def test_profile_change_during_run_keeps_the_run_profile(manager, images):
+    profiles = []
+    run = manager.model.run
+    manager.model.run = lambda batch, profile: profiles.append(profile) or run(batch, profile)
+
+    def paths():
+        yield images[0]
+        manager.set_execution_profile("channels_last")
+        yield from images[1:]
+
+    try:
+        pipeline = RemoveBgPipeline(manager, lambda path, mask, timings: mask, batch_size=2, compose=False)
+        list(pipeline.run(paths()))
+    finally:
+        del manager.model.run
+
+    assert profiles and all(profile is EXECUTION_PROFILES[DEFAULT_PROFILE] for profile in profiles)
+
+
+def test_run_finishes_when_the_profiler_cannot_start(manager, images):
+    class BrokenProfiler:
+        def torch_context(self):
+            raise ImportError("No module named 'torch'")
+
+    pipeline = RemoveBgPipeline(manager, lambda path, mask, timings: mask, compose=False, profiler=BrokenProfiler())
+    results = []
+    worker = threading.Thread(target=lambda: results.extend(pipeline.run(images)), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+
+    assert not worker.is_alive()
+    assert [path for _, path, mask in results if mask is not None] == images
+
+
+@pytest.mark.parametrize("tier, decodes", [("quality", 0), ("fast", 6)])
+def test_mask_only_run_decodes_the_source_only_as_guide(manager, images, monkeypatch, tier, decodes):
+    from src.utils.image_source import SourceImage
+
+    full = SourceImage.full
+    calls = []
+
+    def counting_full(self):
+        if self._full is None:
+            calls.append(self.path)
+        return full(self)
+
+    monkeypatch.setattr(SourceImage, "full", counting_full)
+    manager.set_resolution_tier(tier)
+
+    pipeline = RemoveBgPipeline(manager, lambda path, mask, timings: mask, compose=False)
+    results = list(pipeline.run(images))
+
+    assert all(mask is not None and mask.size == (320, 240) for *_, mask in results)
+    assert len(calls) == decodes
+
+
+def test_int8_without_quantizable_layers_reuses_the_float_model(manager):
+    float_key, float_settings = manager._cache_key("rmbg14"), manager.settings_key()
+    manager.set_precision("int8")
+    try:
+        manager.load_model("rmbg14")  # only the float stand-in is cached, loading another copy would fail here
+        assert manager._cache_key("rmbg14") == float_key
+        assert manager.settings_key() == float_settings
+        assert manager._cache_key("rmbg20") == "rmbg20-int8"
+    finally:
+        manager.set_precision("float")
+
+
+def test_precision_change_does_not_import_torch(manager, monkeypatch):
+    import sys
+
+    monkeypatch.setitem(sys.modules, "torch", None)  # any import of torch fails
+    manager.set_precision("int8")
+    manager.set_precision("float")
@@ -0,0 +1,43 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtGui import QImage
+
+from src.utils.thumbnail_cache import ThumbnailCache, _ThumbnailDisk
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    disk = _ThumbnailDisk(str(tmp_path))
+    image = QImage(64, 64, QImage.Format_RGB32)
+    image.fill(0xff336699)
+
+    paths = [disk.path(f"thumb{i}") for i in range(3)]
+    for i, path in enumerate(paths):
+        disk.write(path, image)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))  # oldest first
+    disk.read(paths[0])  # recently used again
+
+    disk.files.limit = os.path.getsize(paths[0]) * 2.5  # evicts down to 90%, room for two
+    disk.write(disk.path("thumb3"), image)
+
+    assert sorted(os.listdir(tmp_path)) == ["thumb0.png", "thumb3.png"]
+
+
+def test_evicted_paths_are_reloaded(app):
+    cache = ThumbnailCache()
+    image = QImage(64, 64, QImage.Format_RGB32)
+    image.fill(0xff336699)
+    cache.put("result0.png", image)
+    cache.put("result1.png", image)
+    loading = cache._key("result0.png", 128)
+    cache._pending.add(loading)
+
+    cache.evict(["result0.png"])
+    cache._on_loaded(loading, image)  # load of the old result finishing after the eviction
+
+    assert cache._key("result0.png", 64) not in cache._images
+    assert cache._key("result1.png", 64) in cache._images